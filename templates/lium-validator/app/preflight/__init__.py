@@ -2,7 +2,8 @@
 
 from preflight.base import PreflightCheck, CheckResult, CheckStatus
 from preflight.checks import GPUCheck, MatrixValidationCheck, VerifyXCheck
-from preflight.utils import get_gpu_info, suppress_library_output
+from preflight.runner import run_checks
+from preflight.utils import GpuDevice, GpuSnapshot, get_gpu_info, get_gpu_snapshot, get_nvml, shutdown_nvml, suppress_library_output
 from preflight import constants
 
 __all__ = [
@@ -12,7 +13,13 @@ __all__ = [
     "GPUCheck",
     "MatrixValidationCheck",
     "VerifyXCheck",
+    "run_checks",
+    "GpuDevice",
+    "GpuSnapshot",
     "get_gpu_info",
+    "get_gpu_snapshot",
+    "get_nvml",
+    "shutdown_nvml",
     "suppress_library_output",
     "constants",
 ]
@@ -3,6 +3,7 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from enum import Enum
+from typing import Optional
 
 
 class CheckStatus(Enum):
@@ -17,6 +18,7 @@ class CheckResult:
     name: str
     status: CheckStatus
     message: str
+    duration_ms: Optional[float] = None
 
 
 class PreflightCheck(ABC):
@@ -25,8 +27,13 @@ class PreflightCheck(ABC):
 
     Each check is self-contained and runs on the local machine.
     It gathers its own data and validates it.
+
+    `resources` names what the check loads (e.g. "gpu", "memory"); the runner never
+    runs two checks that share a resource at the same time.
     """
 
+    resources: frozenset[str] = frozenset()
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -25,6 +25,9 @@ class GPUCheck(PreflightCheck):
     4. Validates GPU UUIDs are unique
     """
 
+    # Reads utilisation, so it must not overlap with checks loading the GPUs
+    resources = frozenset({"gpu"})
+
     @property
     def name(self) -> str:
         return "GPU Configuration"
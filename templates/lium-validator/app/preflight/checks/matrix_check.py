@@ -1,5 +1,6 @@
 """Matrix multiplication GPU compute validation check."""
 
+import asyncio
 import json
 import logging
 import random
@@ -119,14 +120,18 @@ class MatrixValidationCheck(PreflightCheck):
     3) Verifies the result matches expected output
     """
 
-    def __init__(self, lib_path: str = "/usr/lib/libdmcompverify.so"):
+    resources = frozenset({"gpu"})
+
+    def __init__(self, lib_path: str = "/usr/lib/libdmcompverify.so", memory_fraction: float = 1.0):
         """
         Initialize the matrix validation check.
 
         Args:
             lib_path: Path to libdmcompverify.so
+            memory_fraction: Share of GPU memory dim_k is sized for (benchmarks use smaller ones)
         """
         self.lib_path = lib_path
+        self.memory_fraction = memory_fraction
 
     @property
     def name(self) -> str:
@@ -144,10 +149,11 @@ class MatrixValidationCheck(PreflightCheck):
             wrapper = self._load_wrapper(self.lib_path)
 
             # 3) Choose dimensions/seed/uuid
-            dim_n, seed, challenge_uuid, dim_k = self._choose_params(gpu_info["gpu_memory_mb"])
+            dim_n, seed, challenge_uuid, dim_k = self._choose_params(int(gpu_info["gpu_memory_mb"] * self.memory_fraction))
 
             # 4) Generate cipher (encrypt side)
-            cipher_text = self._generate_cipher_text(
+            cipher_text = await asyncio.to_thread(
+                self._generate_cipher_text,
                 wrapper=wrapper,
                 gpu_info=gpu_info,
                 dim_n=dim_n,
@@ -159,7 +165,8 @@ class MatrixValidationCheck(PreflightCheck):
                 raise CipherGenError(f"Failed to generate cipher text using {self.lib_path}")
 
             # 5) Execute (decrypt side) and fetch returned UUID
-            returned_uuid = self._execute_and_get_uuid(
+            returned_uuid = await asyncio.to_thread(
+                self._execute_and_get_uuid,
                 wrapper=wrapper,
                 cipher_text=cipher_text,
                 seed=seed,
@@ -1,5 +1,6 @@
 """VerifyX validation check for RAM, storage, and network."""
 
+import asyncio
 import json
 import logging
 import random
@@ -155,6 +156,8 @@ class VerifyXCheck(PreflightCheck):
     3. Tests network download speed and integrity
     """
 
+    resources = frozenset({"memory", "storage", "network"})
+
     def __init__(
         self,
         lib_path: str = "/usr/lib/libverifyx.so",
@@ -216,25 +219,8 @@ class VerifyXCheck(PreflightCheck):
                 },
             }
 
-            # 4) Generate challenge
-            logger.debug("generate_challenge input:\n%s", json.dumps(challenge_input, indent=2))
-            if not wrapper.generate_challenge(challenge_input):
-                raise ChallengeGenError("Library returned non-zero from generate_challenge")
-
-            # 5) Get cipher text
-            with suppress_library_output():
-                cipher_text = wrapper.get_cipher_text()
-            if not cipher_text:
-                raise CipherFetchError("Failed to get cipher text from VerifyX challenge")
-
-            # 6) Execute + verify
-            with suppress_library_output():
-                logger.debug("Executing VerifyX tests with cipher preview: %s", cipher_text[:50])
-                result_cipher = wrapper.execute(cipher_text, seed)
-                if not result_cipher:
-                    raise ExecuteError("VerifyX tests failed to execute")
-
-                verification = wrapper.verify(result_cipher, seed)
+            # 4-6) Generate challenge, get cipher text, execute + verify (blocking native calls)
+            verification = await asyncio.to_thread(self._run_challenge, wrapper, challenge_input, seed)
             if not verification:
                 raise VerificationError("VerifyX verify() returned no data")
 
@@ -284,6 +270,25 @@ class VerifyXCheck(PreflightCheck):
         except Exception as e:
             raise LibraryLoadError(f"Cannot load VerifyX library at {lib_path}: {e}") from e
 
+    def _run_challenge(self, wrapper: VerifyXWrapper, challenge_input: dict, seed: int) -> Optional[dict]:
+        """Generate, execute and verify the challenge; returns the verification result."""
+        logger.debug("generate_challenge input:\n%s", json.dumps(challenge_input, indent=2))
+        if not wrapper.generate_challenge(challenge_input):
+            raise ChallengeGenError("Library returned non-zero from generate_challenge")
+
+        with suppress_library_output():
+            cipher_text = wrapper.get_cipher_text()
+        if not cipher_text:
+            raise CipherFetchError("Failed to get cipher text from VerifyX challenge")
+
+        with suppress_library_output():
+            logger.debug("Executing VerifyX tests with cipher preview: %s", cipher_text[:50])
+            result_cipher = wrapper.execute(cipher_text, seed)
+            if not result_cipher:
+                raise ExecuteError("VerifyX tests failed to execute")
+
+            return wrapper.verify(result_cipher, seed)
+
     def _collect_errors(self, verification: dict) -> list[str]:
         """Return human-readable list of errors (empty = pass)."""
         response_data = verification.get("response_data", {})
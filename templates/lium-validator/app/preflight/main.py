@@ -6,16 +6,24 @@ Runs preflight checks and outputs results.
 
 import asyncio
 import json
+import os
 import sys
 import logging
 import argparse
 
 from preflight.checks import GPUCheck, MatrixValidationCheck, VerifyXCheck
 from preflight.base import CheckStatus
+from preflight.runner import benchmark_check, run_checks
+from preflight.utils import shutdown_nvml
 
 logger = logging.getLogger(__name__)
 
 
+def _write_report(report_fd: int, output: dict):
+    with os.fdopen(report_fd, "w") as report:
+        report.write(json.dumps(output, indent=2) + "\n")
+
+
 async def main():
     """Run all preflight checks."""
 
@@ -28,25 +36,53 @@ async def main():
         VerifyXCheck()
     ]
 
-    # Run each check
-    for check in checks:
-        logger.debug(f"Running check: {check.name}")
-        result = await check.run()
-
-        if result.status == CheckStatus.PASSED:
-            logger.debug(f"✓ {result.name}: PASSED - {result.message}")
-        else:  # FAILED
-            logger.debug(f"✗ {result.name}: FAILED - {result.message}")
-            output = {
-                "passed": False,
-                "message": f"{result.name}: {result.message}"
-            }
-            print(json.dumps(output, indent=2))
-            sys.exit(1)
+    # Checks point fd 1 at /dev/null while native code runs in their worker threads, and a
+    # fail-fast exit can land inside that window: report through a copy of stdout taken now
+    report_fd = os.dup(sys.stdout.fileno())
+
+    results = await run_checks(checks)
+    check_durations = [
+        {"name": result.name, "status": result.status.value, "duration_ms": result.duration_ms}
+        for result in results
+    ]
+
+    failed = [result for result in results if result.status != CheckStatus.PASSED]
+    if failed:
+        result = failed[0]
+        output = {
+            "passed": False,
+            "message": f"{result.name}: {result.message}",
+            "checks": check_durations,
+        }
+        _write_report(report_fd, output)
+        # Cancelled checks may still be inside native calls in worker threads; don't wait for
+        # them. os._exit skips atexit handlers, so close the NVML session here.
+        shutdown_nvml()
+        os._exit(1)
 
     # All checks passed
-    output = {"passed": True}
-    print(json.dumps(output, indent=2))
+    output = {"passed": True, "checks": check_durations}
+    _write_report(report_fd, output)
+    sys.exit(0)
+
+
+async def benchmark(iterations: int):
+    """Time the matrix and VerifyX challenges without pass/fail gating."""
+
+    # dim_k is sized from GPU memory in _choose_params/_calculate_max_dim_k; scale the memory
+    # it is sized for to see how the challenge time grows with the dimension
+    variants = [
+        ({"memory_fraction": fraction}, MatrixValidationCheck(memory_fraction=fraction))
+        for fraction in (0.25, 0.5, 1.0)
+    ]
+    variants.append(({}, VerifyXCheck()))
+
+    report = []
+    for params, check in variants:
+        logger.debug(f"Benchmarking {check.name} {params} x{iterations}")
+        report.append({**await benchmark_check(check, iterations), "params": params})
+
+    print(json.dumps({"benchmark": report}, indent=2))
     sys.exit(0)
 
 
@@ -54,6 +90,8 @@ if __name__ == "__main__":
     # Parse command line arguments
     parser = argparse.ArgumentParser(description="Preflight validation checks")
     parser.add_argument("--debug", action="store_true", help="Enable debug logging")
+    parser.add_argument("--benchmark", action="store_true", help="Time the matrix and VerifyX checks instead of validating")
+    parser.add_argument("--iterations", type=int, default=5, help="Runs per benchmarked check (default: 5)")
     args = parser.parse_args()
 
     # Setup logging based on debug flag
@@ -65,4 +103,7 @@ if __name__ == "__main__":
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
 
-    asyncio.run(main())
+    if args.benchmark:
+        asyncio.run(benchmark(max(1, args.iterations)))
+    else:
+        asyncio.run(main())
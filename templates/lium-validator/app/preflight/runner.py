@@ -0,0 +1,94 @@
+"""Concurrent runner for preflight checks."""
+
+import asyncio
+import logging
+import math
+import time
+
+from preflight.base import CheckResult, CheckStatus, PreflightCheck
+
+logger = logging.getLogger(__name__)
+
+
+async def _run_check(check: PreflightCheck, blockers: list[asyncio.Task]) -> CheckResult:
+    if blockers:
+        await asyncio.wait(blockers)
+
+    logger.debug(f"Running check: {check.name}")
+    start = time.perf_counter()
+    result = await check.run()
+    result.duration_ms = round((time.perf_counter() - start) * 1000, 1)
+    return result
+
+
+async def run_checks(checks: list[PreflightCheck]) -> list[CheckResult]:
+    """
+    Run checks concurrently while keeping fail-fast reporting.
+
+    A check starts once every earlier check sharing one of its `resources` has finished,
+    so checks on independent resources overlap and the rest keep their listed order.
+
+    Returns:
+        Results in completion order. On the first failure the remaining checks are
+        cancelled and the failed result is the last one returned.
+    """
+    tasks: list[asyncio.Task] = []
+    for index, check in enumerate(checks):
+        blockers = [
+            tasks[earlier_index]
+            for earlier_index, earlier in enumerate(checks[:index])
+            if earlier.resources & check.resources
+        ]
+        tasks.append(asyncio.create_task(_run_check(check, blockers)))
+
+    results = []
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            result = await next_result
+            results.append(result)
+
+            if result.status == CheckStatus.PASSED:
+                logger.debug(f"✓ {result.name}: PASSED - {result.message} ({result.duration_ms} ms)")
+            else:  # FAILED
+                logger.debug(f"✗ {result.name}: FAILED - {result.message} ({result.duration_ms} ms)")
+                break
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    return results
+
+
+def _percentile(sorted_values: list[float], percentile: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, math.ceil(percentile / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+async def benchmark_check(check: PreflightCheck, iterations: int) -> dict:
+    """
+    Run a check `iterations` times back to back and summarise its wall time.
+
+    Returns:
+        Dict with iterations, failures, p50_ms, p95_ms and runs_per_second
+    """
+    durations = []
+    failures = 0
+    start = time.perf_counter()
+    for _ in range(iterations):
+        result = await _run_check(check, [])
+        durations.append(result.duration_ms)
+        if result.status != CheckStatus.PASSED:
+            failures += 1
+            logger.debug(f"✗ {result.name}: FAILED - {result.message}")
+    elapsed = time.perf_counter() - start
+
+    durations.sort()
+    return {
+        "name": check.name,
+        "iterations": iterations,
+        "failures": failures,
+        "p50_ms": _percentile(durations, 50),
+        "p95_ms": _percentile(durations, 95),
+        "runs_per_second": round(iterations / elapsed, 3) if elapsed > 0 else None,
+    }
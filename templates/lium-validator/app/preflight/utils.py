@@ -1,17 +1,30 @@
 """Shared utilities for preflight checks."""
 
+import atexit
 import os
 import sys
 import logging
+import threading
 from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 
 logger = logging.getLogger(__name__)
 
 
+# Output suppression is process-wide (it swaps file descriptors), so concurrent checks
+# share one redirect: the first entrant installs it and the last one restores the fds.
+_suppress_lock = threading.Lock()
+_suppress_depth = 0
+_saved_fds: Optional[tuple[int, int]] = None
+
+
 @contextmanager
 def suppress_library_output():
     """Suppress stdout/stderr from C library calls (unless in debug mode)."""
+    global _suppress_depth, _saved_fds
+
     # Check if we're in debug mode
     if logger.isEnabledFor(logging.DEBUG):
         # In debug mode, don't suppress anything
@@ -21,24 +34,138 @@ def suppress_library_output():
     stdout_fd = sys.stdout.fileno()
     stderr_fd = sys.stderr.fileno()
 
-    # Save original stdout/stderr
-    stdout_dup = os.dup(stdout_fd)
-    stderr_dup = os.dup(stderr_fd)
+    with _suppress_lock:
+        if _suppress_depth == 0:
+            sys.stdout.flush()
+            sys.stderr.flush()
 
-    # Redirect to /dev/null
-    devnull = os.open(os.devnull, os.O_WRONLY)
-    os.dup2(devnull, stdout_fd)
-    os.dup2(devnull, stderr_fd)
-    os.close(devnull)
+            # Save original stdout/stderr
+            _saved_fds = (os.dup(stdout_fd), os.dup(stderr_fd))
+
+            # Redirect to /dev/null
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, stdout_fd)
+            os.dup2(devnull, stderr_fd)
+            os.close(devnull)
+        _suppress_depth += 1
 
     try:
         yield
     finally:
-        # Restore original stdout/stderr
-        os.dup2(stdout_dup, stdout_fd)
-        os.dup2(stderr_dup, stderr_fd)
-        os.close(stdout_dup)
-        os.close(stderr_dup)
+        with _suppress_lock:
+            _suppress_depth -= 1
+            if _suppress_depth == 0:
+                # Restore original stdout/stderr
+                stdout_dup, stderr_dup = _saved_fds
+                os.dup2(stdout_dup, stdout_fd)
+                os.dup2(stderr_dup, stderr_fd)
+                os.close(stdout_dup)
+                os.close(stderr_dup)
+                _saved_fds = None
+
+
+_nvml_lock = threading.Lock()
+_nvml_initialized = False
+
+
+def shutdown_nvml():
+    """Close the shared NVML session; a no-op if it isn't open."""
+    global _nvml_initialized
+    with _nvml_lock:
+        if _nvml_initialized:
+            import pynvml
+
+            pynvml.nvmlShutdown()
+            _nvml_initialized = False
+
+
+def get_nvml():
+    """Return pynvml with NVML initialised once for the whole preflight run.
+
+    The session is shared by every check and shut down at interpreter exit, or by an
+    explicit shutdown_nvml() before os._exit.
+    """
+    global _nvml_initialized
+    import pynvml
+
+    with _nvml_lock:
+        if not _nvml_initialized:
+            pynvml.nvmlInit()
+            _nvml_initialized = True
+            atexit.register(shutdown_nvml)
+    return pynvml
+
+
+@dataclass(frozen=True)
+class GpuDevice:
+    """One GPU as seen by NVML when the snapshot was taken."""
+    index: int
+    name: str
+    uuid: str
+    utilization: int
+    memory_utilization: int
+    memory_total_mb: int
+
+
+@dataclass(frozen=True)
+class GpuSnapshot:
+    """Immutable inventory of the local GPUs."""
+    devices: tuple[GpuDevice, ...]
+
+    @property
+    def gpu_count(self) -> int:
+        return len(self.devices)
+
+    @property
+    def gpu_model(self) -> str:
+        return self.devices[0].name
+
+    @property
+    def gpu_uuids(self) -> str:
+        return ",".join(device.uuid for device in self.devices)
+
+
+def _query_device(pynvml, index: int) -> GpuDevice:
+    handle = pynvml.nvmlDeviceGetHandleByIndex(index)
+
+    try:
+        utilization = pynvml.nvmlDeviceGetUtilizationRates(handle)
+        gpu_util = utilization.gpu
+        mem_util = utilization.memory
+    except Exception:
+        gpu_util = 0
+        mem_util = 0
+
+    try:
+        memory_info = pynvml.nvmlDeviceGetMemoryInfo(handle)
+        memory_total = memory_info.total // (1024 * 1024)  # MB
+    except Exception:
+        memory_total = 0
+
+    return GpuDevice(
+        index=index,
+        name=pynvml.nvmlDeviceGetName(handle),
+        uuid=pynvml.nvmlDeviceGetUUID(handle),
+        utilization=gpu_util,
+        memory_utilization=mem_util,
+        memory_total_mb=memory_total,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_gpu_snapshot() -> Optional[GpuSnapshot]:
+    """
+    Query every GPU once and cache the result for the life of the process.
+
+    Utilisation values are those at snapshot time. Returns None if no GPUs are detected;
+    NVML errors propagate and are not cached.
+    """
+    pynvml = get_nvml()
+    device_count = pynvml.nvmlDeviceGetCount()
+    if device_count == 0:
+        return None
+
+    return GpuSnapshot(devices=tuple(_query_device(pynvml, i) for i in range(device_count)))
 
 
 def get_gpu_info(include_utilization: bool = False, include_memory: bool = False) -> Optional[dict]:
@@ -54,78 +181,33 @@ def get_gpu_info(include_utilization: bool = False, include_memory: bool = False
         or None if no GPUs detected
     """
     try:
-        import pynvml
-
-        pynvml.nvmlInit()
-        device_count = pynvml.nvmlDeviceGetCount()
-
-        if device_count == 0:
-            pynvml.nvmlShutdown()
+        snapshot = get_gpu_snapshot()
+        if snapshot is None:
             return None
 
-        # Get info from first GPU
-        handle = pynvml.nvmlDeviceGetHandleByIndex(0)
-        gpu_name = pynvml.nvmlDeviceGetName(handle)
-
-        # Get memory from first GPU if requested
-        gpu_memory_mb = None
-        if include_memory:
-            try:
-                memory_info = pynvml.nvmlDeviceGetMemoryInfo(handle)
-                gpu_memory_mb = memory_info.total // (1024 * 1024)  # MB
-            except:
-                gpu_memory_mb = 0
-
-        # Get UUIDs from all GPUs
-        uuids = []
-        gpu_details = []
-
-        for i in range(device_count):
-            handle = pynvml.nvmlDeviceGetHandleByIndex(i)
-            uuid = pynvml.nvmlDeviceGetUUID(handle)
-            uuids.append(uuid)
-
-            if include_utilization:
-                # Get utilization
-                try:
-                    utilization = pynvml.nvmlDeviceGetUtilizationRates(handle)
-                    gpu_util = utilization.gpu
-                    mem_util = utilization.memory
-                except:
-                    gpu_util = 0
-                    mem_util = 0
-
-                # Get memory info
-                try:
-                    memory_info = pynvml.nvmlDeviceGetMemoryInfo(handle)
-                    memory_total = memory_info.total // (1024 * 1024)  # MB
-                except:
-                    memory_total = 0
-
-                gpu_details.append({
-                    "index": i,
-                    "name": pynvml.nvmlDeviceGetName(handle),
-                    "uuid": uuid,
-                    "utilization": gpu_util,
-                    "memory_utilization": mem_util,
-                    "memory_total_mb": memory_total
-                })
-
-        pynvml.nvmlShutdown()
-
-        uuids_str = ",".join(uuids)
+        uuids_str = snapshot.gpu_uuids
         result = {
-            "gpu_count": device_count,
-            "gpu_model": gpu_name,
+            "gpu_count": snapshot.gpu_count,
+            "gpu_model": snapshot.gpu_model,
             "gpu_uuids": uuids_str,
             "uuids": uuids_str,  # Alias for compatibility with different libraries
         }
 
         if include_utilization:
-            result["gpu_details"] = gpu_details
+            result["gpu_details"] = [
+                {
+                    "index": device.index,
+                    "name": device.name,
+                    "uuid": device.uuid,
+                    "utilization": device.utilization,
+                    "memory_utilization": device.memory_utilization,
+                    "memory_total_mb": device.memory_total_mb,
+                }
+                for device in snapshot.devices
+            ]
 
-        if include_memory and gpu_memory_mb is not None:
-            result["gpu_memory_mb"] = gpu_memory_mb
+        if include_memory:
+            result["gpu_memory_mb"] = snapshot.devices[0].memory_total_mb
 
         return result
 
@@ -1,15 +1,37 @@
+import asyncio
 import logging
+import time
+from dataclasses import dataclass, field
 
 from typing import Optional, Dict, Any
 from core.utils import _m, get_extra_info, get_collateral_contract
 from core.config import settings
-from services.const import REQUIRED_DEPOSIT_AMOUNT
+from services.const import (
+    COLLATERAL_CACHE_SECONDS,
+    COLLATERAL_PREFETCH_CONCURRENCY,
+    REQUIRED_DEPOSIT_AMOUNT,
+)
 from clients.subtensor_client import SubtensorClient
-from celium_collateral_contracts import CollateralContract
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class MinerCollateralPrefetch:
+    """Collateral reads of one miner's executors, started once per job request.
+
+    Every read is its own task, so an executor only waits for the entries it needs.
+    """
+
+    # Resolves to the miner's EVM address, or None
+    evm_address: asyncio.Task
+    # (contract version, executor uuid) -> task resolving to (miner address on contract, executor collateral) or the read error
+    states: dict[tuple[str, str], asyncio.Task] = field(default_factory=dict)
+
+    def tasks(self) -> list[asyncio.Task]:
+        return [self.evm_address, *self.states.values()]
+
+
 class CollateralContractService:
     def __init__(self):
         # Check for settings misconfiguration and handle gracefully
@@ -17,24 +39,83 @@ class CollateralContractService:
             version: get_collateral_contract(version=version) for version in settings.CONTRACT_VERSIONS.keys()
         }
         self.subtensor_client = SubtensorClient.get_instance()
+        # (contract version, executor uuid, miner hotkey) -> (fetched at, miner address on contract, executor collateral).
+        # Aged out by wall time rather than by chain head, which would cost a blocking RPC per lookup.
+        self._collateral_cache: dict[tuple[str, str, str], tuple[float, str | None, Any]] = {}
+
+    def _purge_collateral_cache(self):
+        """Drop entries that can no longer be hit."""
+        now = time.monotonic()
+        self._collateral_cache = {
+            key: value for key, value in self._collateral_cache.items()
+            if now - value[0] < COLLATERAL_CACHE_SECONDS
+        }
+
+    async def _get_executor_collateral_state(
+        self,
+        version: str,
+        miner_hotkey: str,
+        executor_uuid: str,
+    ) -> tuple[str | None, Any]:
+        """Miner address and collateral of the executor on one contract version, cached for COLLATERAL_CACHE_SECONDS."""
+        key = (version, executor_uuid, miner_hotkey)
+        cached = self._collateral_cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < COLLATERAL_CACHE_SECONDS:
+            return cached[1], cached[2]
+
+        collateral_contract = self.collateral_contracts[version]
+        miner_address_on_contract, executor_collateral = await asyncio.gather(
+            collateral_contract.get_miner_address_of_executor(executor_uuid),
+            collateral_contract.get_executor_collateral(executor_uuid),
+        )
+        self._collateral_cache[key] = (time.monotonic(), miner_address_on_contract, executor_collateral)
+
+        return miner_address_on_contract, executor_collateral
+
+    def prefetch_miner_collateral(self, miner_hotkey: str, executor_uuids: list[str]) -> MinerCollateralPrefetch:
+        """Start resolving the miner's EVM address once and reading every executor on every contract version.
+
+        Reads start in `executor_uuids` order, at most COLLATERAL_PREFETCH_CONCURRENCY at a time, and are
+        skipped when the miner has no EVM address. The caller cancels `tasks()` once the job is done.
+        """
+        self._purge_collateral_cache()
+        semaphore = asyncio.Semaphore(COLLATERAL_PREFETCH_CONCURRENCY)
+
+        async def resolve_evm_address():
+            return self.subtensor_client.get_evm_address_for_hotkey(miner_hotkey)
+
+        evm_address = asyncio.create_task(resolve_evm_address())
+
+        async def fetch(version: str, executor_uuid: str):
+            try:
+                if await asyncio.shield(evm_address) is None:
+                    return None, None
+                async with semaphore:
+                    return await self._get_executor_collateral_state(version, miner_hotkey, executor_uuid)
+            except Exception as e:
+                return e
+
+        prefetch = MinerCollateralPrefetch(evm_address=evm_address)
+        for executor_uuid in dict.fromkeys(executor_uuids):
+            for version in self.collateral_contracts.keys():
+                prefetch.states[(version, executor_uuid)] = asyncio.create_task(fetch(version, executor_uuid))
+        return prefetch
 
     async def _check_executor_collateral(
         self, 
-        collateral_contract: CollateralContract,
+        evm_address: str | None,
+        miner_address_on_contract: str | None,
+        executor_collateral: Any,
         miner_hotkey: str,
         executor_uuid: str,
         gpu_model: str,
         gpu_count: int,
         default_extra: dict,
     ) -> tuple[bool, str | None]:
-        evm_address = self.subtensor_client.get_evm_address_for_hotkey(miner_hotkey)
-
         if evm_address is None:
             error_message = f"No evm address found that is associated to this miner hotkey {miner_hotkey} in subnet"
             return False, error_message
 
-        miner_address_on_contract = await collateral_contract.get_miner_address_of_executor(executor_uuid)
-
         if miner_address_on_contract is None:
             error_message = f"No miner address found on contract for executor {executor_uuid}"
             return False, error_message
@@ -56,7 +137,6 @@ class CollateralContractService:
             return False, error_message
 
         # Check executor's actual collateral
-        executor_collateral = await collateral_contract.get_executor_collateral(executor_uuid)
         if executor_collateral is None:
             error_message = "Executor doesn't have any collateral deposited on the contract"
             return False, error_message
@@ -88,7 +168,8 @@ class CollateralContractService:
         miner_hotkey: str,
         executor_uuid: str,
         gpu_model: str,
-        gpu_count: int
+        gpu_count: int,
+        collateral_prefetch: MinerCollateralPrefetch | None = None,
     ) -> tuple[bool, str | None, str | None]:
         """
         Check if a specific executor is eligible.
@@ -96,6 +177,7 @@ class CollateralContractService:
         :param executor_uuid: Executor UUID
         :param gpu_model: GPU model
         :param gpu_count: GPU count
+        :param collateral_prefetch: prefetch_miner_collateral of this job request, if any
         :return: Tuple containing eligibility status, error message, and contract version
         """
         error_message = None
@@ -109,10 +191,50 @@ class CollateralContractService:
 
         try:
             error_message = ""
-            for version in self.collateral_contracts.keys():
+            versions = list(self.collateral_contracts.keys())
+
+            # Prefetch tasks are shielded: a timed out executor task must not cancel reads
+            # shared with the other executors of the job
+            try:
+                if collateral_prefetch is not None:
+                    evm_address = await asyncio.shield(collateral_prefetch.evm_address)
+                else:
+                    evm_address = self.subtensor_client.get_evm_address_for_hotkey(miner_hotkey)
+            except Exception as e:
+                for version in versions:
+                    error_message += f"Version: {version} — {str(e)} \n\n"
+                return False, error_message, None
+
+            async def get_state(version: str):
+                prefetched = collateral_prefetch.states.get((version, executor_uuid)) if collateral_prefetch else None
+                if prefetched is not None:
+                    state = await asyncio.shield(prefetched)
+                    if isinstance(state, Exception):
+                        raise state
+                    return state
+                return await self._get_executor_collateral_state(version, miner_hotkey, executor_uuid)
+
+            if evm_address is None:
+                states = [(None, None)] * len(versions)
+            else:
+                # Fetch every version at once, but keep checking them in order
+                states = await asyncio.gather(
+                    *[
+                        get_state(version)
+                        for version in versions
+                    ],
+                    return_exceptions=True,
+                )
+
+            for version, state in zip(versions, states):
                 try:
+                    if isinstance(state, Exception):
+                        raise state
+                    miner_address_on_contract, executor_collateral = state
                     collateral_deposited, collateral_contract_error_message = await self._check_executor_collateral(
-                        collateral_contract=self.collateral_contracts[version],
+                        evm_address=evm_address,
+                        miner_address_on_contract=miner_address_on_contract,
+                        executor_collateral=executor_collateral,
                         miner_hotkey=miner_hotkey,
                         executor_uuid=executor_uuid,
                         gpu_model=gpu_model,
@@ -432,5 +432,63 @@ STORAGE_MIN_AVAILABLE_GB = 100
 STORAGE_THROUGHPUT_TEST_GB = 5
 NETWORK_TIMEOUT_SECONDS = 120
 NETWORK_MIN_DOWNLOAD_SPEED_MBPS = 50.0
+# Compare the VerifyX library with a remote, challenge-salted sha256sum instead of downloading it
+VERIFYX_REMOTE_CHECKSUM = False
+# Idle DMCompVerify / VerifyX native objects kept for reuse per validator process
+NATIVE_HANDLE_POOL_SIZE = 4
+# Precomputed matrix challenges kept per (gpu memory, machine info) bucket
+MATRIX_CHALLENGE_QUEUE_DEPTH = 1
+MATRIX_CHALLENGE_QUEUE_MAX_KEYS = 4096
+MATRIX_CHALLENGE_TTL_SECONDS = 60 * 60
+# Background refills generate one challenge at a time and only on an otherwise idle verifier
+MATRIX_CHALLENGE_REFILL_CONCURRENCY = 1
+# Deadline of the remote decrypt_challenge.py run: process/CUDA start-up plus a rate per 1024
+# of dim_k (~2M on 80 GB), read from the setting of the same name. No rate is shipped until one
+# is measured on hardware; without it the script gets the executor's JOB_TIME_OUT - 60 budget,
+# the bound it had before its output was streamed.
+MATRIX_CHALLENGE_BASE_TIMEOUT_SECONDS = 60
+MATRIX_CHALLENGE_TIMEOUT_PER_1K_DIM_K_MS = None
+
+# Executor docker image/volume pruning
+PRUNE_WINDOW_SECONDS = 60 * 60  # each kind of prune runs at most once per window per executor
+PRUNE_DELAY_SECONDS = 60  # deletions within this delay share one background image prune
+PRUNE_MIN_FREE_DISK_KB = 200 * 1024 * 1024  # prune only when hard_disk.free is below 200 GB
+PRUNE_IMAGE_UNUSED_SECONDS = 3 * 24 * 60 * 60  # tagged images are evicted only after 3 days without a rental
+PRUNE_VOLUME_PROTECTION_SECONDS = 15 * 60  # created volumes are skipped until mounted or expired
+PRUNE_PROTECTED_IMAGE_PREFIXES = (
+    "daturaai/compute-subnet-executor",
+    "daturaai/batch-port-verifier",
+    "daturaai/dind",
+    "containrrr/watchtower",
+)
+
+# Pre-pulling popular rental images on idle executors
+IMAGE_WARM_CACHE_TOP_N = 5
+IMAGE_WARM_CACHE_MIN_FREE_DISK_KB = 500 * 1024 * 1024  # only executors with 500 GB free
+IMAGE_WARM_CACHE_INTERVAL_SECONDS = 6 * 60 * 60  # per executor
+
+# Collateral contract reads are reused for about this many blocks (12 s block time)
+COLLATERAL_CACHE_BLOCKS = 5
+COLLATERAL_BLOCK_TIME_SECONDS = 12
+COLLATERAL_CACHE_SECONDS = COLLATERAL_CACHE_BLOCKS * COLLATERAL_BLOCK_TIME_SECONDS
+# Concurrent contract reads when prefetching all executors of a miner
+COLLATERAL_PREFETCH_CONCURRENCY = 16
+
+# Executors of one job request validated at once, per miner and across all miners; defaults
+# for the settings of the same names, like JOB_MIN_EXECUTOR_RUN_SECONDS
+JOB_MAX_CONCURRENT_EXECUTORS_PER_MINER = 16
+JOB_MAX_CONCURRENT_EXECUTORS = 128
+# Executors whose slot frees up with less than this left before the job deadline are skipped
+JOB_MIN_EXECUTOR_RUN_SECONDS = 60
+# Executor results finishing within this window are published to MACHINE_SPEC_CHANNEL together
+MACHINE_SPEC_PUBLISH_BATCH_SECONDS = 1
+
+# Pooled miner websocket connections
+MINER_CONNECTION_IDLE_SECONDS = 5 * 60
+MINER_CONNECTION_SWEEP_SECONDS = 30  # how often idle or closed connections are dropped
+# A connection idle for longer than this must answer a ping within MINER_CONNECTION_PING_TIMEOUT
+# before it is lent again, so half-open sockets (e.g. dropped by a NAT) are replaced
+MINER_CONNECTION_PING_AFTER_IDLE_SECONDS = 10
+MINER_CONNECTION_PING_TIMEOUT = 5
 
 PREFERRED_POD_PORTS = [22, 20000, 20001, 20002, 20003, 20004, 20005, 20006, 20007, 20008, 20009]
@@ -1,5 +1,8 @@
 import asyncio
 import random
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
 from datetime import datetime
 import logging
 import time
@@ -35,6 +38,7 @@ from protocol.vc_protocol.compute_requests import RentedMachine
 from core.utils import _m, get_extra_info, retry_ssh_command
 from daos.port_mapping_dao import PortMappingDao
 from services.const import PREFERRED_POD_PORTS
+from services.prune_scheduler import executor_key, prune_scheduler
 from services.redis_service import (
     AVAILABLE_PORT_MAPS_PREFIX,
     STREAMING_LOG_CHANNEL,
@@ -53,12 +57,254 @@ REPOSITORIES = [
 ]
 
 LOG_STREAM_INTERVAL = 5  # 5 seconds
+LOG_STREAM_BATCH_SIZE = 500  # publish early once this many lines are buffered
+LOG_STREAM_MAX_QUEUE_SIZE = 10000  # lines beyond this are dropped and counted
+CONTAINER_EVENTS_SINCE = "60s"  # window of past docker events replayed by check_container_running
+REGISTRY_REQUEST_CONCURRENCY = 10
+REGISTRY_TOKEN_DEFAULT_EXPIRES_IN = 300  # seconds, Docker Hub's usual token lifetime
+REGISTRY_TOKEN_EXPIRY_MARGIN = 30  # seconds, refresh tokens this long before they expire
+DIGEST_CACHE_TTL = 300  # seconds before a cached digest is revalidated with its ETag
+POD_LOGS_MAX_TAIL = 5000  # most recent lines returned by one pod log request
+POD_LOGS_READ_SIZE = 64 * 1024  # bytes read per chunk while following pod logs
 
 DOCKER_VOLUME_PLUGINS = {
     "s3fs": "mochoa/s3fs-volume-plugin"
 }
 
 
+class LogStream:
+    """Log pipeline of one container operation into Redis `STREAMING_LOG_CHANNEL`.
+
+    Producers call `put` without locking; a background task publishes a batch every
+    `LOG_STREAM_INTERVAL` seconds or as soon as `LOG_STREAM_BATCH_SIZE` lines are
+    buffered. When the queue is full new lines are dropped and counted in `dropped`.
+    """
+
+    def __init__(
+        self,
+        redis_service: RedisService,
+        miner_hotkey: str,
+        executor_id: str,
+        interval: float = LOG_STREAM_INTERVAL,
+        batch_size: int = LOG_STREAM_BATCH_SIZE,
+        max_size: int = LOG_STREAM_MAX_QUEUE_SIZE,
+    ):
+        self.redis_service = redis_service
+        self.miner_hotkey = miner_hotkey
+        self.executor_id = executor_id
+        self.interval = interval
+        self.batch_size = batch_size
+        self.queue: asyncio.Queue[dict | None] = asyncio.Queue(maxsize=max_size)
+        self.published = 0
+        self.dropped = 0
+        self._closing = False
+        self._task: asyncio.Task | None = None
+        self.default_extra = {
+            "miner_hotkey": miner_hotkey,
+            "executor_uuid": executor_id,
+        }
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def put(self, log_text: str, log_status: str, log_tag: str):
+        if self._closing:
+            return
+        try:
+            self.queue.put_nowait(
+                {
+                    "log_text": log_text,
+                    "log_status": log_status,
+                    "log_tag": log_tag,
+                }
+            )
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def close(self):
+        """Flush everything queued so far and stop the publisher."""
+        if self._closing:
+            return
+        self._closing = True
+        if self._task is None:
+            return
+
+        # The sentinel is queued after every pending line, so they all get published first
+        await self.queue.put(None)
+        await self._task
+
+        logger.info(
+            _m(
+                "Exit handle_stream_logs",
+                extra=get_extra_info({
+                    **self.default_extra,
+                    "published_logs": self.published,
+                    "dropped_logs": self.dropped,
+                }),
+            )
+        )
+
+    async def _next_batch(self) -> tuple[list[dict], bool]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.interval
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                item = self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _run(self):
+        finished = False
+        while not finished:
+            logs_to_process, finished = await self._next_batch()
+            if not logs_to_process:
+                continue
+
+            try:
+                await self.redis_service.publish(
+                    STREAMING_LOG_CHANNEL,
+                    {
+                        "logs": logs_to_process,
+                        "miner_hotkey": self.miner_hotkey,
+                        "executor_uuid": self.executor_id,
+                    },
+                )
+                self.published += len(logs_to_process)
+
+                logger.info(
+                    _m(
+                        f"Successfully published {len(logs_to_process)} logs",
+                        extra=get_extra_info(self.default_extra),
+                    )
+                )
+
+            except Exception as e:
+                logger.error(
+                    _m(
+                        "Error publishing log stream",
+                        extra=get_extra_info({**self.default_extra, "error": str(e)}),
+                    ),
+                    exc_info=True,
+                )
+
+
+async def gather_or_cancel(*coros):
+    """Run coroutines concurrently; if one fails, cancel the rest before re-raising."""
+    tasks = [asyncio.create_task(coro) for coro in coros]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+# Shared by every DockerService instance: repository -> (token, expires_at)
+_registry_tokens: dict[str, tuple[str, float]] = {}
+# "repository:tag" -> (digest, etag, fetched_at)
+_digest_cache: dict[str, tuple[str | None, str | None, float]] = {}
+_registry_semaphore = asyncio.Semaphore(REGISTRY_REQUEST_CONCURRENCY)
+# Fire-and-forget image cache bookkeeping, referenced until done so it isn't collected
+_image_cache_tasks: set[asyncio.Task] = set()
+
+
+# Applies "+<key>" / "-<key>" lines from stdin to a copy of authorized_keys, swaps it in
+# with a single rename and prints the resulting file.
+AUTHORIZED_KEYS_SCRIPT = """set -e
+f=/root/.ssh/authorized_keys
+mkdir -p /root/.ssh
+chmod 700 /root/.ssh
+touch "$f"
+tmp="$f.tmp.$$"
+cp "$f" "$tmp"
+while IFS= read -r line; do
+  key="${line#?}"
+  case "$line" in
+    +*) grep -qxF -- "$key" "$tmp" || printf '%s\\n' "$key" >> "$tmp" ;;
+    -*) grep -vxF -- "$key" "$tmp" > "$tmp.new" || true; mv "$tmp.new" "$tmp" ;;
+  esac
+done
+chmod 600 "$tmp"
+mv "$tmp" "$f"
+cat "$f"
+"""
+
+
+def _log_timestamp_key(timestamp: str) -> str:
+    # `docker logs -t` prints RFC3339Nano in UTC, which trims trailing zeros of the fraction
+    seconds, _, fraction = timestamp.rstrip("Z").partition(".")
+    return f"{seconds}.{fraction.ljust(9, '0')}"
+
+
+def parse_container_logs(container_name: str, lines: list[str], since: str | None = None) -> list[dict]:
+    """Turn `docker logs -t` lines into log entries newer than `since`.
+
+    Entries have the {"container_name", "timestamp", "log"} shape of the entries the miner
+    relays for a full pod log request. `docker logs --since` is inclusive, so lines at the
+    cursor itself were already returned.
+    """
+    since_key = _log_timestamp_key(since) if since else None
+    entries = []
+    for line in lines:
+        timestamp, _, log = line.rstrip("\r\n").partition(" ")
+        if not timestamp:
+            continue
+        if since_key is not None and _log_timestamp_key(timestamp) <= since_key:
+            continue
+        entries.append({"container_name": container_name, "timestamp": timestamp, "log": log})
+    return entries
+
+
+def container_logs_command(container_name: str, since: str | None, tail: int, follow: bool = False) -> str:
+    command = f"/usr/bin/docker logs --timestamps --tail {int(tail)}"
+    if since:
+        command += f" --since {shlex.quote(since)}"
+    if follow:
+        command += " --follow"
+    return f"{command} {shlex.quote(container_name)} 2>&1"
+
+
+@dataclass
+class SshKeyOperation:
+    container_name: str
+    public_key: str
+    add: bool = True
+
+
+@dataclass
+class SshKeyOperationResult:
+    container_name: str
+    public_key: str
+    add: bool
+    success: bool
+    error: str | None = None
+
+
+@dataclass
+class BulkContainerResult:
+    executor_id: str
+    container_name: str
+    action: str
+    success: bool
+    error: str | None = None
+
+
+# Log stream of the container operation running in the current task
+current_log_stream: ContextVar[LogStream | None] = ContextVar("current_log_stream", default=None)
+
+
 class DockerService:
     def __init__(
         self,
@@ -69,10 +315,6 @@ class DockerService:
         self.ssh_service = ssh_service
         self.redis_service = redis_service
         self.port_mapping_dao = port_mapping_dao
-        self.lock = asyncio.Lock()
-        self.logs_queue: list[dict] = []
-        self.log_task: asyncio.Task | None = None
-        self.is_realtime_logging = False
 
     async def generate_portMappings(self, miner_hotkey: str, executor_id: str, internal_ports: list[int] = None) -> list[tuple[int, int, int]]:
         try:
@@ -153,14 +395,7 @@ class DockerService:
             ),
         )
 
-        async with self.lock:
-            self.logs_queue.append(
-                {
-                    "log_text": log_text,
-                    "log_status": "success",
-                    "log_tag": log_tag,
-                }
-            )
+        self.stream_log(log_text, "success", log_tag)
 
         status = True
         error = ''
@@ -173,14 +408,7 @@ class DockerService:
         except asyncio.TimeoutError:
             status = False
             error = "Process timed out"
-            async with self.lock:
-                self.logs_queue.append(
-                    {
-                        "log_text": error,
-                        "log_status": "error",
-                        "log_tag": log_tag,
-                    }
-                )
+            self.stream_log(error, "error", log_tag)
 
         if not status and raise_exception:
             raise Exception(f"Failed ${log_text}. command: {command} error: {error}")
@@ -188,98 +416,101 @@ class DockerService:
         return status, error
 
     async def _stream_process_output(self, process, log_tag):
-        status = True
-        error = ''
+        """Drain stdout and stderr concurrently, streaming lines in arrival order.
 
-        async for line in process.stdout:
-            async with self.lock:
-                self.logs_queue.append(
-                    {
-                        "log_text": line.strip(),
-                        "log_status": "success",
-                        "log_tag": log_tag,
-                    }
-                )
+        Reading one stream to EOF before the other lets a chatty stderr fill the SSH
+        channel window and stall the remote process.
+        """
+        errors = []
 
-        async for line in process.stderr:
-            async with self.lock:
-                status = False
-                error += line.strip() + "\n"
-                self.logs_queue.append(
-                    {
-                        "log_text": line.strip(),
-                        "log_status": "error",
-                        "log_tag": log_tag,
-                    }
-                )
+        async def drain_stdout():
+            async for line in process.stdout:
+                self.stream_log(line.strip(), "success", log_tag)
 
-        return status, error
+        async def drain_stderr():
+            async for line in process.stderr:
+                errors.append(line.strip() + "\n")
+                self.stream_log(line.strip(), "error", log_tag)
 
-    async def handle_stream_logs(
-        self,
-        miner_hotkey,
-        executor_id,
-    ):
-        default_extra = {
-            "miner_hotkey": miner_hotkey,
-            "executor_uuid": executor_id,
-        }
+        await asyncio.gather(drain_stdout(), drain_stderr())
 
-        self.is_realtime_logging = True
+        return not errors, "".join(errors)
 
-        while True:
-            await asyncio.sleep(LOG_STREAM_INTERVAL)
+    def stream_log(self, log_text: str, log_status: str, log_tag: str):
+        log_stream = current_log_stream.get()
+        if log_stream is not None:
+            log_stream.put(log_text, log_status, log_tag)
 
-            async with self.lock:
-                logs_to_process = self.logs_queue[:]
-                self.logs_queue.clear()
+    def start_stream_logs(
+        self,
+        miner_hotkey,
+        executor_id,
+    ) -> LogStream:
+        """Start real-time logging for the container operation running in the current task."""
+        log_stream = LogStream(self.redis_service, miner_hotkey, executor_id)
+        log_stream.start()
+        current_log_stream.set(log_stream)
+        return log_stream
 
-            if logs_to_process:
-                try:
-                    await self.redis_service.publish(
-                        STREAMING_LOG_CHANNEL,
-                        {
-                            "logs": logs_to_process,
-                            "miner_hotkey": miner_hotkey,
-                            "executor_uuid": executor_id,
-                        },
-                    )
+    async def finish_stream_logs(self):
+        log_stream = current_log_stream.get()
+        if log_stream is not None:
+            current_log_stream.set(None)
+            await log_stream.close()
 
-                    logger.info(
-                        _m(
-                            f"Successfully published {len(logs_to_process)} logs",
-                            extra=get_extra_info(default_extra),
-                        )
-                    )
+    async def check_container_running(
+        self, ssh_client: asyncssh.SSHClientConnection, container_name: str, timeout: int = 10
+    ):
+        """Check if the container is running.
+
+        Watches `docker events` for the container until its first start or die event, then
+        confirms the state with `docker inspect`: events from the last CONTAINER_EVENTS_SINCE
+        are replayed so a container that `docker run -d` already started resolves immediately,
+        but a replayed event may belong to an earlier container with the same name. The remote
+        watcher runs under `timeout` so it exits on its own once we stop reading. Falls back to
+        polling `docker ps` if the events stream can't be opened.
+        """
+        command = (
+            f"timeout {timeout} /usr/bin/docker events --filter container={container_name} "
+            f"--filter event=start --filter event=die "
+            f"--since {CONTAINER_EVENTS_SINCE} --format '{{{{.Action}}}}'"
+        )
+        start_time = time.time()
 
-                except Exception as e:
-                    logger.error(
-                        _m(
-                            "Error publishing log stream",
-                            extra=get_extra_info({**default_extra, "error": str(e)}),
-                        ),
-                        exc_info=True,
-                    )
+        try:
+            async with ssh_client.create_process(command, stderr=asyncssh.DEVNULL) as process:
 
-            if not self.is_realtime_logging:
-                break
+                async def wait_for_event():
+                    async for line in process.stdout:
+                        if line.strip() in ("start", "die"):
+                            return True
+                    return False
 
-        logger.info(
-            _m(
-                "Exit handle_stream_logs",
-                extra=get_extra_info(default_extra),
-            )
+                try:
+                    has_event = await asyncio.wait_for(wait_for_event(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    has_event = True
+
+            if has_event:
+                return await self._inspect_container_running(ssh_client, container_name)
+        except (OSError, asyncssh.Error) as e:
+            logger.warning(f"Failed to watch docker events for {container_name}: {e}")
+
+        # Stream closed without an event: docker events isn't usable here
+        remaining = max(timeout - (time.time() - start_time), 1)
+        return await self._poll_container_running(ssh_client, container_name, remaining)
+
+    async def _inspect_container_running(
+        self, ssh_client: asyncssh.SSHClientConnection, container_name: str
+    ) -> bool:
+        result = await ssh_client.run(
+            f"/usr/bin/docker inspect -f '{{{{.State.Running}}}}' {container_name}"
         )
+        return result.exit_status == 0 and result.stdout.strip() == "true"
 
-    async def finish_stream_logs(self):
-        self.is_realtime_logging = False
-        if self.log_task:
-            await self.log_task
-
-    async def check_container_running(
+    async def _poll_container_running(
         self, ssh_client: asyncssh.SSHClientConnection, container_name: str, timeout: int = 10
     ):
-        """Check if the container is running"""
         start_time = time.time()
         while time.time() - start_time < timeout:
             result = await ssh_client.run(f"/usr/bin/docker ps -q -f name={container_name}")
@@ -292,8 +523,9 @@ class DockerService:
         self,
         ssh_client: asyncssh.SSHClientConnection,
         default_extra: dict,
-        sleep: int = 0,
-        clear_volume: bool = True
+        sleep: float = 0,
+        clear_volume: bool = True,
+        keep_volumes: tuple[str, ...] = (),
     ):
         command = '/usr/bin/docker ps -a --filter "name=^/container_" --format "{{.Names}}"'
         result = await ssh_client.run(command)
@@ -316,7 +548,14 @@ class DockerService:
             command = f'/usr/bin/docker rm {container_names} -f'
             await retry_ssh_command(ssh_client, command, 'clean_existing_containers')
 
-            if clear_volume:
+            if clear_volume and keep_volumes:
+                # Same as `docker volume prune -af`, minus volumes set up for the new container
+                result = await ssh_client.run('/usr/bin/docker volume ls -q --filter dangling=true')
+                volumes = [volume for volume in result.stdout.split() if volume not in keep_volumes]
+                if volumes:
+                    command = f'/usr/bin/docker volume rm {" ".join(shlex.quote(v) for v in volumes)}'
+                    await retry_ssh_command(ssh_client, command, 'clean_existing_containers')
+            elif clear_volume:
                 command = f'/usr/bin/docker volume prune -af'
                 await retry_ssh_command(ssh_client, command, 'clean_existing_containers')
 
@@ -405,6 +644,40 @@ class DockerService:
         command = f"/usr/bin/docker plugin disable s3fs -f"
         await ssh_client.run(command)
 
+    async def _record_image_cache_result(
+        self,
+        ssh_client: asyncssh.SSHClientConnection,
+        docker_image: str,
+        track_popularity: bool,
+        default_extra: dict,
+    ):
+        """Count the rental towards the executor image cache hit rate and, for public images, the image's popularity."""
+        try:
+            command = f"/usr/bin/docker image inspect --format '{{{{.Id}}}}' {shlex.quote(docker_image)}"
+            result = await ssh_client.run(command)
+            hit = result.exit_status == 0
+
+            if track_popularity:
+                await self.redis_service.increment_image_popularity(docker_image)
+            await self.redis_service.record_image_cache_result(hit)
+            stats = await self.redis_service.get_image_cache_stats()
+            hits, misses = stats.get("hits", 0), stats.get("misses", 0)
+
+            logger.info(
+                _m(
+                    f"Image cache {'hit' if hit else 'miss'} for {docker_image}",
+                    extra=get_extra_info({
+                        **default_extra,
+                        "image_cache_hit": hit,
+                        "image_cache_hits": hits,
+                        "image_cache_misses": misses,
+                        "image_cache_hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0,
+                    }),
+                ),
+            )
+        except Exception as e:
+            logger.warning(f"Failed to record image cache result for {docker_image}: {e}")
+
     async def create_container(
         self,
         payload: ContainerCreateRequest,
@@ -508,11 +781,9 @@ class DockerService:
                 prev_timestamp = int(datetime.utcnow().timestamp() * 1000)
 
                 # set real-time logging
-                self.log_task = asyncio.create_task(
-                    self.handle_stream_logs(
-                        miner_hotkey=payload.miner_hotkey,
-                        executor_id=payload.executor_id,
-                    )
+                self.start_stream_logs(
+                    miner_hotkey=payload.miner_hotkey,
+                    executor_id=payload.executor_id,
                 )
                 # command = f"/usr/bin/docker logout"
                 # await self.execute_and_stream_logs(
@@ -522,34 +793,6 @@ class DockerService:
                 #     log_text=f"Logging out of Docker registry",
                 #     log_extra=default_extra,
                 # )
-                if payload.docker_username and payload.docker_password:
-                    command = f"echo '{payload.docker_password}' | /usr/bin/docker login --username '{payload.docker_username}' --password-stdin"
-                    await self.execute_and_stream_logs(
-                        ssh_client=ssh_client,
-                        command=command,
-                        log_tag=log_tag,
-                        log_text=f"Logging in to Docker registry as {payload.docker_image}",
-                        log_extra=default_extra,
-                        raise_exception=False
-                    )
-
-                # Add profiler for docker login
-                profilers.append({"name": "Docker login step finished", "duration": int(datetime.utcnow().timestamp() * 1000) - prev_timestamp})
-                prev_timestamp = int(datetime.utcnow().timestamp() * 1000)
-
-                command = f"/usr/bin/docker pull {payload.docker_image}"
-                await self.execute_and_stream_logs(
-                    ssh_client=ssh_client,
-                    command=command,
-                    log_tag=log_tag,
-                    log_text=f"Pulling docker image {payload.docker_image}",
-                    log_extra=default_extra,
-                )
-
-                # Add profiler for docker pull
-                profilers.append({"name": "Docker pull step finished", "duration": int(datetime.utcnow().timestamp() * 1000) - prev_timestamp})
-                prev_timestamp = int(datetime.utcnow().timestamp() * 1000)
-
                 port_flags = " ".join(
                     [
                         f"-p {internal_port}:{docker_port}"
@@ -604,33 +847,117 @@ class DockerService:
                 )
 
                 uuid = uuid4()
+                if not local_volume:
+                    local_volume = f"volume_{uuid}"
+                    create_local_volume = True
+                else:
+                    create_local_volume = False
+
+                # Keep scheduled prunes away from volumes until the container mounts them
+                pruning_key = executor_key(executor_info)
+                prune_scheduler.protect_volume(pruning_key, local_volume)
+                if external_volume_info:
+                    prune_scheduler.protect_volume(pruning_key, external_volume_info.name)
+
+                # The image pull doesn't touch the executor's current containers, so it overlaps
+                # with creating the new local volume. Existing containers, which on an edit are
+                # the renter's running pod, are only removed once the pull has succeeded. The
+                # s3fs volume comes after that: its setup runs `docker plugin disable s3fs -f`,
+                # which would detach a running pod's mount.
+                loop = asyncio.get_running_loop()
+                # wait until the docker connection check is finished before removing containers
+                cleanup_not_before = loop.time() + 10
+                stage_started_at = int(datetime.utcnow().timestamp() * 1000)
+
+                async def profile_step(name: str, coro):
+                    started_at = int(datetime.utcnow().timestamp() * 1000)
+                    result = await coro
+                    finished_at = int(datetime.utcnow().timestamp() * 1000)
+                    profilers.append({
+                        "name": name,
+                        "duration": finished_at - started_at,
+                        "offset": started_at - stage_started_at,
+                        "parallel": True,
+                    })
+                    return result
+
+                async def pull_image():
+                    # Off the critical path: the `docker image inspect` answers long before a
+                    # pull of a missing image could land. Private images are kept out of the
+                    # popularity set, which drives pre-pulls on other executors.
+                    record_task = asyncio.create_task(
+                        self._record_image_cache_result(
+                            ssh_client,
+                            payload.docker_image,
+                            not (payload.docker_username and payload.docker_password),
+                            default_extra,
+                        )
+                    )
+                    _image_cache_tasks.add(record_task)
+                    record_task.add_done_callback(_image_cache_tasks.discard)
+
+                    if payload.docker_username and payload.docker_password:
+                        command = f"echo '{payload.docker_password}' | /usr/bin/docker login --username '{payload.docker_username}' --password-stdin"
+                        await profile_step(
+                            "Docker login step finished",
+                            self.execute_and_stream_logs(
+                                ssh_client=ssh_client,
+                                command=command,
+                                log_tag=log_tag,
+                                log_text=f"Logging in to Docker registry as {payload.docker_image}",
+                                log_extra=default_extra,
+                                raise_exception=False
+                            ),
+                        )
+
+                    command = f"/usr/bin/docker pull {payload.docker_image}"
+                    await profile_step(
+                        "Docker pull step finished",
+                        self.execute_and_stream_logs(
+                            ssh_client=ssh_client,
+                            command=command,
+                            log_tag=log_tag,
+                            log_text=f"Pulling docker image {payload.docker_image}",
+                            log_extra=default_extra,
+                        ),
+                    )
+
+                async def create_local_volume_step():
+                    if not create_local_volume:
+                        return
+                    # create docker volume
+                    command = f"/usr/bin/docker volume create {local_volume}"
+                    await profile_step(
+                        "Local volume creation step finished",
+                        self.execute_and_stream_logs(
+                            ssh_client=ssh_client,
+                            command=command,
+                            log_tag=log_tag,
+                            log_text=f"Creating docker volume {local_volume}",
+                            log_extra=default_extra,
+                            timeout=10,
+                        ),
+                    )
+
+                await gather_or_cancel(pull_image(), create_local_volume_step())
+                await prune_scheduler.touch_images(self.redis_service, pruning_key, [payload.docker_image])
+
+                # Add profiler for the whole overlapped stage
+                profilers.append({"name": "Image pull and local volume creation finished", "duration": int(datetime.utcnow().timestamp() * 1000) - prev_timestamp})
+                prev_timestamp = int(datetime.utcnow().timestamp() * 1000)
 
                 await self.clean_existing_containers(
                     ssh_client=ssh_client,
                     default_extra=default_extra,
-                    sleep=10,
-                    clear_volume=False if local_volume else True,
+                    sleep=max(0, cleanup_not_before - loop.time()),
+                    clear_volume=create_local_volume,
+                    keep_volumes=(local_volume,),
                 )
 
-                # Add profiler for docker volume creation
+                # Add profiler for container cleaning
                 profilers.append({"name": "Container cleaning step finished", "duration": int(datetime.utcnow().timestamp() * 1000) - prev_timestamp})
                 prev_timestamp = int(datetime.utcnow().timestamp() * 1000)
 
-                if not local_volume:
-                    # create docker volume
-                    local_volume = f"volume_{uuid}"
-                    command = f"/usr/bin/docker volume create {local_volume}"
-                    await self.execute_and_stream_logs(
-                        ssh_client=ssh_client,
-                        command=command,
-                        log_tag=log_tag,
-                        log_text=f"Creating docker volume {local_volume}",
-                        log_extra=default_extra,
-                        timeout=10,
-                    )
-
-                volume_flag = f"-v {local_volume}:{local_volume_path}"
-
                 if external_volume_info:
                     await self.create_s3fs_volume(
                         ssh_client=ssh_client,
@@ -638,9 +965,14 @@ class DockerService:
                         volume_info=external_volume_info,
                         log_tag=log_tag,
                     )
+
                     # Add profiler for docker volume creation
                     profilers.append({"name": "Docker volume creation step finished", "duration": int(datetime.utcnow().timestamp() * 1000) - prev_timestamp})
                     prev_timestamp = int(datetime.utcnow().timestamp() * 1000)
+
+                volume_flag = f"-v {local_volume}:{local_volume_path}"
+
+                if external_volume_info:
                     # Important: disable sysbox when using s3fs volume because s3fs volume is not supported by sysbox
                     payload.is_sysbox = False
 
@@ -687,6 +1019,10 @@ class DockerService:
                     await self.clean_existing_containers(ssh_client=ssh_client, default_extra=default_extra)
                     raise Exception("Run docker run command but container is not running")
 
+                prune_scheduler.release_volume(pruning_key, local_volume)
+                if external_volume_info:
+                    prune_scheduler.release_volume(pruning_key, external_volume_info.name)
+
                 # Add profiler for docker container creation
                 profilers.append({"name": "Docker container creation step finished", "duration": int(datetime.utcnow().timestamp() * 1000) - prev_timestamp})
                 prev_timestamp = int(datetime.utcnow().timestamp() * 1000)
@@ -698,14 +1034,7 @@ class DockerService:
                     ),
                 )
 
-                async with self.lock:
-                    self.logs_queue.append(
-                        {
-                            "log_text": "Created Docker Container",
-                            "log_status": "success",
-                            "log_tag": log_tag,
-                        }
-                    )
+                self.stream_log("Created Docker Container", "success", log_tag)
 
                 # skip installing ssh service for daturaai images
                 # if payload.docker_image.startswith("daturaai/"):
@@ -728,9 +1057,10 @@ class DockerService:
                 prev_timestamp = int(datetime.utcnow().timestamp() * 1000)
 
                 # add rest of public keys
-                for public_key in payload.user_public_keys:
-                    command = f"/usr/bin/docker exec {container_name} sh -c 'echo \"{public_key}\" >> ~/.ssh/authorized_keys'"
-                    await ssh_client.run(command)
+                await self.update_authorized_keys(ssh_client, [
+                    SshKeyOperation(container_name, public_key)
+                    for public_key in payload.user_public_keys
+                ])
 
                 # add environment variables
                 if custom_options and custom_options.environment:
@@ -788,7 +1118,6 @@ class DockerService:
             )
             logger.error(log_text, exc_info=True)
 
-            await self.finish_stream_logs()
             await self.redis_service.remove_pending_pod(payload.miner_hotkey, payload.executor_id)
 
             return FailedContainerRequest(
@@ -798,6 +1127,10 @@ class DockerService:
                 error_type=FailedContainerErrorTypes.ContainerCreationFailed,
                 error_code=FailedContainerErrorCodes.UnknownError,
             )
+        finally:
+            # Also reached on cancellation, which `except Exception` doesn't catch: stop the
+            # publisher task and drop its queue. A no-op when the stream was already closed.
+            await self.finish_stream_logs()
 
     async def stop_container(
         self,
@@ -885,6 +1218,101 @@ class DockerService:
                 ),
             )
 
+    @asynccontextmanager
+    async def container_logs_reader(
+        self,
+        executor_info: ExecutorSSHInfo,
+        keypair: bittensor.Keypair,
+        private_key: str,
+        container_name: str,
+    ):
+        """Yield `read(since, tail)`, which reads the container's logs over one SSH session.
+
+        Pollers keep the reader open and pass the last entry's timestamp as `since`, so
+        each poll costs one `docker logs` run instead of a new connection.
+        """
+        private_key = self.ssh_service.decrypt_payload(keypair.ss58_address, private_key)
+        pkey = asyncssh.import_private_key(private_key)
+
+        async with asyncssh.connect(
+            host=executor_info.address,
+            port=executor_info.ssh_port,
+            username=executor_info.ssh_username,
+            client_keys=[pkey],
+            known_hosts=None,
+        ) as ssh_client:
+
+            async def read(since: str | None = None, tail: int = POD_LOGS_MAX_TAIL) -> list[dict]:
+                result = await ssh_client.run(
+                    container_logs_command(container_name, since, min(tail, POD_LOGS_MAX_TAIL))
+                )
+                if result.exit_status != 0:
+                    raise Exception(f"Failed to get logs of {container_name}: {result.stdout}")
+                return parse_container_logs(container_name, result.stdout.splitlines(), since)
+
+            yield read
+
+    async def get_container_logs(
+        self,
+        executor_info: ExecutorSSHInfo,
+        keypair: bittensor.Keypair,
+        private_key: str,
+        container_name: str,
+        since: str | None = None,
+        tail: int = POD_LOGS_MAX_TAIL,
+    ) -> list[dict]:
+        """Log lines of the container after the `since` cursor, at most the last `tail` of them."""
+        async with self.container_logs_reader(executor_info, keypair, private_key, container_name) as read:
+            return await read(since, tail)
+
+    async def stream_container_logs(
+        self,
+        executor_info: ExecutorSSHInfo,
+        keypair: bittensor.Keypair,
+        private_key: str,
+        container_name: str,
+        since: str | None = None,
+        tail: int = POD_LOGS_MAX_TAIL,
+    ):
+        """Follow the container's logs, yielding lists of entries as chunks arrive over SSH."""
+        private_key = self.ssh_service.decrypt_payload(keypair.ss58_address, private_key)
+        pkey = asyncssh.import_private_key(private_key)
+
+        async with asyncssh.connect(
+            host=executor_info.address,
+            port=executor_info.ssh_port,
+            username=executor_info.ssh_username,
+            client_keys=[pkey],
+            known_hosts=None,
+        ) as ssh_client:
+            async with ssh_client.create_process(
+                container_logs_command(container_name, since, min(tail, POD_LOGS_MAX_TAIL), follow=True)
+            ) as process:
+                try:
+                    partial = ""
+                    while True:
+                        chunk = await process.stdout.read(POD_LOGS_READ_SIZE)
+                        if not chunk:
+                            break
+
+                        lines = (partial + chunk).split("\n")
+                        partial = lines.pop()
+                        entries = parse_container_logs(container_name, lines, since)
+                        if entries:
+                            yield entries
+
+                    if partial:
+                        entries = parse_container_logs(container_name, [partial], since)
+                        if entries:
+                            yield entries
+                finally:
+                    # Without a PTY, closing the channel leaves `docker logs --follow` running
+                    if process.exit_status is None:
+                        try:
+                            process.kill()
+                        except (OSError, asyncssh.Error):
+                            pass
+
     async def delete_container(
         self,
         payload: ContainerDeleteRequest,
@@ -923,8 +1351,8 @@ class DockerService:
                 command = f"/usr/bin/docker rm {payload.container_name} -f"
                 await retry_ssh_command(ssh_client, command, "delete_container", 3, 5)
 
-                command = f"/usr/bin/docker image prune -f"
-                await retry_ssh_command(ssh_client, command, "delete_container", 3, 5)
+                # Image pruning is deferred and coalesced per executor
+                prune_scheduler.schedule_image_prune(executor_info, pkey, self.redis_service)
 
                 if payload.local_volume:
                     command = f"/usr/bin/docker volume rm {payload.local_volume}"
@@ -977,6 +1405,293 @@ class DockerService:
                 error_code=FailedContainerErrorCodes.UnknownError,
             )
 
+    async def _bulk_container_command(
+        self,
+        ssh_client: asyncssh.SSHClientConnection,
+        action: str,
+        command: str,
+        payloads: list,
+    ) -> list[BulkContainerResult]:
+        """Run one docker command for all containers; docker prints the name of each container it handled."""
+        container_names = " ".join(shlex.quote(payload.container_name) for payload in payloads)
+        try:
+            result = await ssh_client.run(f"{command} {container_names}", timeout=120)
+            handled = set(result.stdout.split())
+            error = result.stderr.strip() or None
+        except Exception as e:
+            handled, error = set(), str(e)
+
+        return [
+            BulkContainerResult(
+                executor_id=payload.executor_id,
+                container_name=payload.container_name,
+                action=action,
+                success=payload.container_name in handled,
+                error=None if payload.container_name in handled else error,
+            )
+            for payload in payloads
+        ]
+
+    async def _bulk_container_operation_on_executor(
+        self,
+        executor_info: ExecutorSSHInfo,
+        pkey: asyncssh.SSHKey,
+        payloads: list[ContainerStopRequest | ContainerStartRequest | ContainerDeleteRequest],
+    ) -> list[BulkContainerResult]:
+        stops = [payload for payload in payloads if isinstance(payload, ContainerStopRequest)]
+        starts = [payload for payload in payloads if isinstance(payload, ContainerStartRequest)]
+        deletes = [payload for payload in payloads if isinstance(payload, ContainerDeleteRequest)]
+
+        try:
+            async with asyncssh.connect(
+                host=executor_info.address,
+                port=executor_info.ssh_port,
+                username=executor_info.ssh_username,
+                client_keys=[pkey],
+                known_hosts=None,
+            ) as ssh_client:
+                results = []
+                if stops:
+                    results += await self._bulk_container_command(ssh_client, "stop", "/usr/bin/docker stop", stops)
+                if starts:
+                    results += await self._bulk_container_command(ssh_client, "start", "/usr/bin/docker start", starts)
+                if deletes:
+                    delete_results = await self._bulk_container_command(ssh_client, "delete", "/usr/bin/docker rm -f", deletes)
+                    results += delete_results
+
+                    deleted = [
+                        payload for payload, result in zip(deletes, delete_results) if result.success
+                    ]
+                    volumes = [payload.local_volume for payload in deleted if payload.local_volume]
+                    external_volumes = [payload.external_volume for payload in deleted if payload.external_volume]
+                    if volumes or external_volumes:
+                        volume_names = " ".join(shlex.quote(volume) for volume in volumes + external_volumes)
+                        await ssh_client.run(f"/usr/bin/docker volume rm {volume_names}")
+                    if external_volumes:
+                        await self.disable_s3fs_volume_plugin(ssh_client)
+
+                    if deleted:
+                        await self.redis_service.remove_rented_machine(executor_info)
+                        prune_scheduler.schedule_image_prune(executor_info, pkey, self.redis_service)
+
+                return results
+        except Exception as e:
+            logger.error(
+                _m(
+                    "Failed bulk container operation",
+                    extra=get_extra_info({
+                        "executor_ip_address": executor_info.address,
+                        "executor_ssh_port": executor_info.ssh_port,
+                        "error": str(e),
+                    }),
+                ),
+                exc_info=True,
+            )
+            return [
+                BulkContainerResult(
+                    executor_id=payload.executor_id,
+                    container_name=payload.container_name,
+                    action=action,
+                    success=False,
+                    error=str(e),
+                )
+                for action, group in (("stop", stops), ("start", starts), ("delete", deletes))
+                for payload in group
+            ]
+
+    async def bulk_container_operation(
+        self,
+        requests: list[tuple[ContainerStopRequest | ContainerStartRequest | ContainerDeleteRequest, ExecutorSSHInfo]],
+        keypair: bittensor.Keypair,
+        private_key: str,
+    ) -> list[BulkContainerResult]:
+        """Stop/start/delete many containers with one SSH session and one docker command per executor.
+
+        Requests are grouped by executor and executors are handled concurrently. Deletions
+        use a single `docker rm -f a b c` and leave image pruning to the prune scheduler.
+        """
+        logger.info(
+            _m(
+                "Bulk container operation",
+                extra=get_extra_info({"requests": len(requests)}),
+            ),
+        )
+
+        private_key = self.ssh_service.decrypt_payload(keypair.ss58_address, private_key)
+        pkey = asyncssh.import_private_key(private_key)
+
+        executors: dict[tuple[str, int], ExecutorSSHInfo] = {}
+        payloads_by_executor: dict[tuple[str, int], list] = {}
+        for payload, executor_info in requests:
+            key = executor_key(executor_info)
+            executors[key] = executor_info
+            payloads_by_executor.setdefault(key, []).append(payload)
+
+        executor_results = await asyncio.gather(*[
+            self._bulk_container_operation_on_executor(executors[key], pkey, payloads)
+            for key, payloads in payloads_by_executor.items()
+        ])
+        results = [result for results in executor_results for result in results]
+
+        logger.info(
+            _m(
+                "Finished bulk container operation",
+                extra=get_extra_info({
+                    "executors": len(payloads_by_executor),
+                    "succeeded": sum(1 for result in results if result.success),
+                    "failed": sum(1 for result in results if not result.success),
+                }),
+            ),
+        )
+        return results
+
+    async def _update_container_authorized_keys(
+        self,
+        ssh_client: asyncssh.SSHClientConnection,
+        container_name: str,
+        operations: list[SshKeyOperation],
+    ) -> list[SshKeyOperationResult]:
+        results = []
+        lines = []
+        for operation in operations:
+            public_key = operation.public_key.strip()
+            if not public_key or "\n" in public_key or "\r" in public_key:
+                results.append(SshKeyOperationResult(
+                    container_name, operation.public_key, operation.add, False, "Invalid public key"
+                ))
+                continue
+            lines.append(("+" if operation.add else "-") + public_key)
+
+        if not lines:
+            return results
+
+        command = f"/usr/bin/docker exec -i {container_name} sh -c {shlex.quote(AUTHORIZED_KEYS_SCRIPT)}"
+        try:
+            result = await ssh_client.run(command, input="\n".join(lines) + "\n", timeout=60)
+            if result.exit_status != 0:
+                raise Exception(result.stderr.strip() or f"exit status {result.exit_status}")
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            return results + [
+                SshKeyOperationResult(container_name, line[1:], line[0] == "+", False, error)
+                for line in lines
+            ]
+
+        # Report each key from the file that is actually in place now
+        authorized_keys = {key.strip() for key in result.stdout.splitlines()}
+        for line in lines:
+            add, public_key = line[0] == "+", line[1:]
+            success = (public_key in authorized_keys) == add
+            results.append(SshKeyOperationResult(
+                container_name,
+                public_key,
+                add,
+                success,
+                None if success else "authorized_keys was not updated",
+            ))
+        return results
+
+    async def update_authorized_keys(
+        self,
+        ssh_client: asyncssh.SSHClientConnection,
+        operations: list[SshKeyOperation],
+    ) -> list[SshKeyOperationResult]:
+        """Apply many key additions/removals over one SSH connection.
+
+        Each container's authorized_keys is rewritten atomically by a single `docker exec`;
+        containers are updated concurrently. Results are per key, in container order.
+        """
+        operations_by_container: dict[str, list[SshKeyOperation]] = {}
+        for operation in operations:
+            operations_by_container.setdefault(operation.container_name, []).append(operation)
+
+        container_results = await asyncio.gather(*[
+            self._update_container_authorized_keys(ssh_client, container_name, container_operations)
+            for container_name, container_operations in operations_by_container.items()
+        ])
+        return [result for results in container_results for result in results]
+
+    async def _update_ssh_keys_on_executor(
+        self,
+        executor_info: ExecutorSSHInfo,
+        pkey: asyncssh.SSHKey,
+        operations: list[SshKeyOperation],
+    ) -> list[SshKeyOperationResult]:
+        try:
+            async with asyncssh.connect(
+                host=executor_info.address,
+                port=executor_info.ssh_port,
+                username=executor_info.ssh_username,
+                client_keys=[pkey],
+                known_hosts=None,
+            ) as ssh_client:
+                return await self.update_authorized_keys(ssh_client, operations)
+        except Exception as e:
+            logger.error(
+                _m(
+                    "Failed to update ssh keys on executor",
+                    extra=get_extra_info({
+                        "executor_ip_address": executor_info.address,
+                        "executor_ssh_port": executor_info.ssh_port,
+                        "error": str(e),
+                    }),
+                ),
+                exc_info=True,
+            )
+            return [
+                SshKeyOperationResult(
+                    operation.container_name, operation.public_key, operation.add, False, str(e)
+                )
+                for operation in operations
+            ]
+
+    async def batch_update_ssh_keys(
+        self,
+        requests: list[tuple[SshKeyOperation, ExecutorSSHInfo]],
+        keypair: bittensor.Keypair,
+        private_key: str,
+    ) -> list[SshKeyOperationResult]:
+        """Add/remove keys across many pods with one SSH session per executor.
+
+        Operations are grouped by executor and executors are handled concurrently; on each
+        executor every container's authorized_keys is rewritten by a single `docker exec`.
+        Results are per key.
+        """
+        logger.info(
+            _m(
+                "Batch update ssh keys",
+                extra=get_extra_info({"operations": len(requests)}),
+            ),
+        )
+
+        private_key = self.ssh_service.decrypt_payload(keypair.ss58_address, private_key)
+        pkey = asyncssh.import_private_key(private_key)
+
+        executors: dict[tuple[str, int], ExecutorSSHInfo] = {}
+        operations_by_executor: dict[tuple[str, int], list[SshKeyOperation]] = {}
+        for operation, executor_info in requests:
+            key = executor_key(executor_info)
+            executors[key] = executor_info
+            operations_by_executor.setdefault(key, []).append(operation)
+
+        executor_results = await asyncio.gather(*[
+            self._update_ssh_keys_on_executor(executors[key], pkey, operations)
+            for key, operations in operations_by_executor.items()
+        ])
+        results = [result for results in executor_results for result in results]
+
+        logger.info(
+            _m(
+                "Batch updated ssh keys",
+                extra=get_extra_info({
+                    "executors": len(operations_by_executor),
+                    "succeeded": sum(1 for result in results if result.success),
+                    "failed": sum(1 for result in results if not result.success),
+                }),
+            ),
+        )
+        return results
+
     async def remove_ssh_keys(
         self,
         payload: RemoveSshPublicKeysRequest,
@@ -1030,22 +1745,14 @@ class DockerService:
                         error_code=FailedContainerErrorCodes.NoSshKeys,
                     )
 
-                # Remove each public key from authorized_keys
-                for pubkey in payload.user_public_keys:
-                    # Remove the public key from authorized_keys
-                    # Properly escape slashes and pluses in pubkey for sed
-                    # Use Python's shlex.quote to safely quote the pubkey for shell usage
-                    import shlex
-
-                    # Remove the public key from authorized_keys by matching the exact line
-                    # This approach is safer and more reliable than trying to escape characters for sed
-                    quoted_pubkey = shlex.quote(pubkey)
-                    remove_cmd = (
-                        f"/usr/bin/docker exec -i {payload.container_name} "
-                        f"sh -c \"grep -vxF {quoted_pubkey} /root/.ssh/authorized_keys > /root/.ssh/authorized_keys.tmp && "
-                        f"mv /root/.ssh/authorized_keys.tmp /root/.ssh/authorized_keys\""
-                    )
-                    await ssh_client.run(remove_cmd)
+                # Remove every public key from authorized_keys in one atomic rewrite
+                results = await self.update_authorized_keys(ssh_client, [
+                    SshKeyOperation(payload.container_name, pubkey, add=False)
+                    for pubkey in payload.user_public_keys
+                ])
+                failed = [result for result in results if not result.success]
+                if failed:
+                    raise Exception(f"Failed to remove {len(failed)} ssh key(s): {failed[0].error}")
 
                 logger.info(
                     _m(
@@ -1131,9 +1838,13 @@ class DockerService:
                         error_code=FailedContainerErrorCodes.NoSshKeys,
                     )
 
-                for public_key in payload.user_public_keys:
-                    command = f"/usr/bin/docker exec -i {payload.container_name} sh -c 'echo \"{public_key}\" >> ~/.ssh/authorized_keys'"
-                    await retry_ssh_command(ssh_client, command, "add_ssh_key", 3, 5)
+                results = await self.update_authorized_keys(ssh_client, [
+                    SshKeyOperation(payload.container_name, public_key)
+                    for public_key in payload.user_public_keys
+                ])
+                failed = [result for result in results if not result.success]
+                if failed:
+                    raise Exception(f"Failed to add {len(failed)} ssh key(s): {failed[0].error}")
 
                 logger.info(
                     _m(
@@ -1165,59 +1876,104 @@ class DockerService:
                 error_code=FailedContainerErrorCodes.UnknownError,
             )
 
+    async def _get_registry_token(self, session: aiohttp.ClientSession, repository: str) -> str:
+        """Return a pull token for `repository`, reusing the cached one until shortly before it expires."""
+        cached = _registry_tokens.get(repository)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+
+        async with _registry_semaphore:
+            async with session.get(
+                f"https://auth.docker.io/token?service=registry.docker.io&scope=repository:{repository}:pull"
+            ) as token_response:
+                token_response.raise_for_status()
+                token_data = await token_response.json()
+
+        token = token_data.get("token")
+        expires_in = token_data.get("expires_in") or REGISTRY_TOKEN_DEFAULT_EXPIRES_IN
+        _registry_tokens[repository] = (token, time.monotonic() + expires_in - REGISTRY_TOKEN_EXPIRY_MARGIN)
+        return token
+
+    async def _get_manifest_digest(
+        self, session: aiohttp.ClientSession, repository: str, tag: str, token: str
+    ) -> str | None:
+        """Return the digest of `repository:tag`, revalidating cached entries with their ETag after the TTL."""
+        key = f"{repository}:{tag}"
+        cached = _digest_cache.get(key)
+        if cached and time.monotonic() - cached[2] < DIGEST_CACHE_TTL:
+            return cached[0]
+
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.docker.distribution.manifest.v2+json",
+        }
+        if cached and cached[1]:
+            headers["If-None-Match"] = cached[1]
+
+        async with _registry_semaphore:
+            async with session.head(
+                f"https://index.docker.io/v2/{repository}/manifests/{tag}",
+                headers=headers,
+            ) as manifest_response:
+                if manifest_response.status == 304 and cached:
+                    digest, etag = cached[0], cached[1]
+                else:
+                    manifest_response.raise_for_status()
+                    digest = manifest_response.headers.get("Docker-Content-Digest")
+                    etag = manifest_response.headers.get("ETag")
+
+        _digest_cache[key] = (digest, etag, time.monotonic())
+        return digest
+
+    async def _get_repository_digests(self, session: aiohttp.ClientSession, repo: str) -> dict[str, str]:
+        try:
+            # Split repository and tag if specified
+            if ":" in repo:
+                repository, specified_tag = repo.split(":", 1)
+            else:
+                repository, specified_tag = repo, None
+
+            # Get authorization token
+            token = await self._get_registry_token(session, repository)
+
+            # Find all tags if no specific tag is specified
+            if specified_tag is None:
+                async with _registry_semaphore:
+                    async with session.get(
+                        f"https://index.docker.io/v2/{repository}/tags/list",
+                        headers={"Authorization": f"Bearer {token}"},
+                    ) as tags_response:
+                        tags_response.raise_for_status()
+                        tags_data = await tags_response.json()
+                        all_tags = tags_data.get("tags", [])
+            else:
+                all_tags = [specified_tag]
+
+            digests = await gather_or_cancel(
+                *[self._get_manifest_digest(session, repository, tag, token) for tag in all_tags]
+            )
+            return {f"{repository}:{tag}": digest for tag, digest in zip(all_tags, digests)}
+
+        except aiohttp.ClientError as e:
+            print(f"Error retrieving data for {repo}: {e}")
+            return {}
+
     async def get_docker_hub_digests(self, repositories) -> dict[str, str]:
-        """Retrieve all tags and their corresponding digests from Docker Hub."""
+        """Retrieve all tags and their corresponding digests from Docker Hub.
+
+        Repositories and tags are fetched concurrently (at most REGISTRY_REQUEST_CONCURRENCY
+        requests in flight), with tokens and digests served from module-level caches.
+        """
         all_digests = {}  # Initialize a dictionary to store all tag-digest pairs
 
         async with aiohttp.ClientSession() as session:
-            for repo in repositories:
-                try:
-                    # Split repository and tag if specified
-                    if ":" in repo:
-                        repository, specified_tag = repo.split(":", 1)
-                    else:
-                        repository, specified_tag = repo, None
+            # Sibling requests are cancelled on failure instead of outliving the session
+            results = await gather_or_cancel(
+                *[self._get_repository_digests(session, repo) for repo in repositories]
+            )
 
-                    # Get authorization token
-                    async with session.get(
-                        f"https://auth.docker.io/token?service=registry.docker.io&scope=repository:{repository}:pull"
-                    ) as token_response:
-                        token_response.raise_for_status()
-                        token = await token_response.json()
-                        token = token.get("token")
-
-                    # Find all tags if no specific tag is specified
-                    if specified_tag is None:
-                        async with session.get(
-                            f"https://index.docker.io/v2/{repository}/tags/list",
-                            headers={"Authorization": f"Bearer {token}"},
-                        ) as tags_response:
-                            tags_response.raise_for_status()
-                            tags_data = await tags_response.json()
-                            all_tags = tags_data.get("tags", [])
-                    else:
-                        all_tags = [specified_tag]
-
-                    # Dictionary to store tag-digest pairs for the current repository
-                    tag_digests = {}
-                    for tag in all_tags:
-                        # Get image digest
-                        async with session.head(
-                            f"https://index.docker.io/v2/{repository}/manifests/{tag}",
-                            headers={
-                                "Authorization": f"Bearer {token}",
-                                "Accept": "application/vnd.docker.distribution.manifest.v2+json",
-                            },
-                        ) as manifest_response:
-                            manifest_response.raise_for_status()
-                            digest = manifest_response.headers.get("Docker-Content-Digest")
-                            tag_digests[f"{repository}:{tag}"] = digest
-
-                    # Update the all_digests dictionary with the current repository's tag-digest pairs
-                    all_digests.update(tag_digests)
-
-                except aiohttp.ClientError as e:
-                    print(f"Error retrieving data for {repo}: {e}")
+        for tag_digests in results:
+            all_digests.update(tag_digests)
 
         return all_digests
 
@@ -2,6 +2,8 @@ import asyncio
 import json
 import logging
 import random
+import shlex
+import time
 from typing import Any
 from uuid import UUID
 
@@ -18,8 +20,12 @@ from models.port_mapping import PortMapping
 from services.const import (
     BATCH_PORT_VERIFICATION_SIZE,
     DOCKER_DIND_IMAGE,
+    IMAGE_WARM_CACHE_INTERVAL_SECONDS,
+    IMAGE_WARM_CACHE_MIN_FREE_DISK_KB,
+    IMAGE_WARM_CACHE_TOP_N,
     PREFERRED_POD_PORTS,
 )
+from services.prune_scheduler import executor_key, prune_scheduler
 from services.redis_service import (
     AVAILABLE_PORT_MAPS_PREFIX,
     RedisService,
@@ -28,6 +34,7 @@ from services.redis_service import (
 # Constants
 BATCH_VERIFIER_CONTAINER_PREFIX = "container_batch_verifier"
 BATCH_VERIFIER_IMAGE = "daturaai/batch-port-verifier:0.0.0"
+IMAGE_WARM_PROCESS_NAME = "lium-image-warm"
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +49,8 @@ class ExecutorConnectivityService:
     def __init__(self, redis_service: "RedisService", port_mapping_dao: PortMappingDao):
         self.redis_service = redis_service
         self.port_mapping_dao = port_mapping_dao
+        # executor key -> last time popular images were pre-pulled on it
+        self.last_image_warm: dict[tuple[str, int], float] = {}
 
     async def batch_verify_ports(
         self,
@@ -67,7 +76,7 @@ class ExecutorConnectivityService:
 
         """Verify multiple ports concurrently."""
         try:
-            await self.cleanup_docker_containers(ssh_client, extra)
+            await self.cleanup_docker_containers(ssh_client, executor_info, extra)
 
             port_maps = self.get_available_port_maps(executor_info, BATCH_PORT_VERIFICATION_SIZE)
             if not port_maps:
@@ -392,7 +401,9 @@ class ExecutorConnectivityService:
             logger.error(_m(f"Error saving ports to database: {e}", extra), exc_info=True)
             # Redis still works as fallback
 
-    async def cleanup_docker_containers(self, ssh_client: SSHClientConnection, extra: dict = {}):
+    async def cleanup_docker_containers(
+        self, ssh_client: SSHClientConnection, executor_info: ExecutorSSHInfo, extra: dict = {}
+    ):
         # Clean container_ prefixed containers
         command = '/usr/bin/docker ps -a --filter "name=^/container_" --format "{{.Names}}"'
         result = await ssh_client.run(command)
@@ -412,12 +423,71 @@ class ExecutorConnectivityService:
             command = f"/usr/bin/docker rm {container_names_str} -f"
             await ssh_client.run(command)
 
-            command = "/usr/bin/docker volume prune -af"
-            await ssh_client.run(command)
+        # Dangling volumes are removed by the per-executor prune scheduler, at most once per
+        # window and only when the executor is short on disk
+        await prune_scheduler.prune_volumes(ssh_client, executor_key(executor_info), extra)
 
         # Log cleanup completion
         logger.info(_m(f"CLEANUP: Cleanup completed, removed: {len(container_names)} containers", extra))
 
+    async def warm_image_cache(
+        self,
+        ssh_client: SSHClientConnection,
+        executor_info: ExecutorSSHInfo,
+        free_disk_kb: int,
+        extra: dict = {},
+    ):
+        """Pre-pull the most rented images on an idle executor so the next pod skips `docker pull`.
+
+        Runs at most once per IMAGE_WARM_CACHE_INTERVAL_SECONDS per executor, only with enough
+        free disk, and detaches the pulls with nohup so validation doesn't wait for them.
+        """
+        key = executor_key(executor_info)
+        if free_disk_kb < IMAGE_WARM_CACHE_MIN_FREE_DISK_KB:
+            return
+        if time.monotonic() - self.last_image_warm.get(key, float("-inf")) < IMAGE_WARM_CACHE_INTERVAL_SECONDS:
+            return
+        self.last_image_warm[key] = time.monotonic()
+
+        try:
+            popular_images = await self.redis_service.get_popular_images(IMAGE_WARM_CACHE_TOP_N)
+            if not popular_images:
+                return
+
+            result = await ssh_client.run(
+                # [x]yz keeps pgrep from matching this command line itself
+                f"pgrep -f '[{IMAGE_WARM_PROCESS_NAME[0]}]{IMAGE_WARM_PROCESS_NAME[1:]}' > /dev/null; echo $?; "
+                "/usr/bin/docker images --filter dangling=false --format '{{.Repository}}:{{.Tag}}'"
+            )
+            lines = result.stdout.split()
+            if not lines or lines[0] == "0":
+                # A previous pre-pull is still running
+                return
+            present_images = set(lines[1:])
+
+            # Popular images count as in use, so unused-image eviction keeps them around
+            await prune_scheduler.touch_images(self.redis_service, key, popular_images)
+
+            missing_images = []
+            for image in popular_images:
+                tagged_image = image if ":" in image.rsplit("/", 1)[-1] else f"{image}:latest"
+                if tagged_image not in present_images:
+                    missing_images.append(image)
+
+            if not missing_images:
+                return
+
+            script = 'for image in "$@"; do /usr/bin/docker pull "$image"; done'
+            images_args = " ".join(shlex.quote(image) for image in missing_images)
+            await ssh_client.run(
+                f"nohup sh -c {shlex.quote(script)} {IMAGE_WARM_PROCESS_NAME} {images_args} > /dev/null 2>&1 &",
+                timeout=10,
+            )
+
+            logger.info(_m(f"IMAGE CACHE: pre-pulling {len(missing_images)} popular images: {missing_images}", extra))
+        except Exception as e:
+            logger.warning(_m(f"IMAGE CACHE: failed to pre-pull popular images: {e}", extra))
+
     def get_available_port_maps(
         self,
         executor_info: ExecutorSSHInfo,
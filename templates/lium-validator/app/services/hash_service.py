@@ -17,27 +17,59 @@ class Algorithm(enum.Enum):
 
     @property
     def params(self):
-        return {
-            Algorithm.SHA256: {
-                "hash_function": hashlib.sha256,
-                "hash_type": "1410",
-            },
-            Algorithm.SHA384: {
-                "hash_function": hashlib.sha384,
-                "hash_type": "10810",
-            },
-            Algorithm.SHA512: {
-                "hash_function": hashlib.sha512,
-                "hash_type": "1710",
-            },
-        }
+        return _ALGORITHM_PARAMS[self]
+
+    @property
+    def hash_function(self):
+        return _ALGORITHM_PARAMS[self]["hash_function"]
 
     def hash(self, *args, **kwargs):
-        return self.params[self]["hash_function"](*args, **kwargs)
+        return self.hash_function(*args, **kwargs)
 
     @property
     def type(self):
-        return self.params[self]["hash_type"]
+        return _ALGORITHM_PARAMS[self]["hash_type"]
+
+
+_ALGORITHM_PARAMS = {
+    Algorithm.SHA256: {
+        "hash_function": hashlib.sha256,
+        "hash_type": "1410",
+    },
+    Algorithm.SHA384: {
+        "hash_function": hashlib.sha384,
+        "hash_type": "10810",
+    },
+    Algorithm.SHA512: {
+        "hash_function": hashlib.sha512,
+        "hash_type": "1710",
+    },
+}
+
+
+def _alphabet_table(alphabet: str) -> tuple[bytes, bytes]:
+    """Build a bytes.translate table mapping random bytes onto `alphabet` without modulo bias.
+
+    Bytes at or above the largest multiple of len(alphabet) are returned as the delete set,
+    so every character is equally likely (rejection sampling).
+    """
+    limit = 256 - 256 % len(alphabet)
+    table = bytes(ord(alphabet[i % len(alphabet)]) if i < limit else 0 for i in range(256))
+    return table, bytes(range(limit, 256))
+
+
+_LETTERS_TABLE = _alphabet_table(string.ascii_letters)
+_DIGITS_TABLE = _alphabet_table(string.digits)
+
+
+def _random_chars(alphabet_table: tuple[bytes, bytes], n: int) -> bytes:
+    """Draw `n` uniformly distributed alphabet characters from the OS CSPRNG in bulk."""
+    table, rejected = alphabet_table
+    chars = b""
+    while len(chars) < n:
+        # Over-draw by 1/8 so the rejected tail rarely needs a second round
+        chars += secrets.token_bytes(n - len(chars) + (n >> 3) + 8).translate(table, rejected)
+    return chars[:n]
 
 
 @dataclass
@@ -95,6 +127,16 @@ class HashService:
     def random_string(self, num_letters: int, num_digits: int) -> str:
         return ''.join(random.choices(string.ascii_letters, k=num_letters)) + ''.join(random.choices(string.digits, k=num_digits))
 
+    @classmethod
+    def random_strings(cls, num_letters: int, num_digits: int, count: int) -> list[str]:
+        """Generate `count` random strings like `random_string` from one bulk draw per alphabet."""
+        letters = _random_chars(_LETTERS_TABLE, num_letters * count).decode("ascii")
+        digits = _random_chars(_DIGITS_TABLE, num_digits * count).decode("ascii")
+        return [
+            letters[i * num_letters:(i + 1) * num_letters] + digits[i * num_digits:(i + 1) * num_digits]
+            for i in range(count)
+        ]
+
     @classmethod
     def generate(
         cls,
@@ -119,12 +161,13 @@ class HashService:
 
             challenges = [
                 sorted(
-                    {
-                        cls.random_string(
-                            num_letters=_params.num_letters, num_digits=_params.num_digits
+                    set(
+                        cls.random_strings(
+                            num_letters=_params.num_letters,
+                            num_digits=_params.num_digits,
+                            count=_params.num_hashes,
                         )
-                        for _ in range(_params.num_hashes)
-                    }
+                    )
                 )
                 for _params in job_params
             ]
@@ -147,9 +190,10 @@ class HashService:
     def hash_masks(self, job: HashcatJob) -> list[str]:
         return ["?1" * param.num_letters + "?d" * param.num_digits for param in job.job_params]
 
-    def hash_hexes(self, algorithm: Algorithm, challenges: list[str], salt: str) -> list[str]:
+    def hash_hexes(self, algorithm: Algorithm, challenges: list[str], salt: bytes) -> list[str]:
+        hash_function = algorithm.hash_function
         return [
-            algorithm.hash(challenge.encode("ascii") + salt).hexdigest()
+            hash_function(challenge.encode("ascii") + salt).hexdigest()
             for challenge in challenges
         ]
 
@@ -160,14 +204,11 @@ class HashService:
     #     return "\n".join([f"{hash_hex}:{self.salts[i].hex()}" for hash_hex in self.hash_hexes(i)])
 
     def _payloads(self, job: HashcatJob) -> list[str]:
-        payloads = [
-            "\n".join([
-                f"{hash_hex}:{job.salts[i].hex()}"
-                for hash_hex
-                in self.hash_hexes(job.job_params[i].algorithm, job.challenges[i], job.salts[i])
-            ])
-            for i in range(self.num_job_params)
-        ]
+        payloads = []
+        for i in range(self.num_job_params):
+            suffix = f":{job.salts[i].hex()}"
+            hash_hexes = self.hash_hexes(job.job_params[i].algorithm, job.challenges[i], job.salts[i])
+            payloads.append("\n".join([hash_hex + suffix for hash_hex in hash_hexes]))
         return payloads
 
     @property
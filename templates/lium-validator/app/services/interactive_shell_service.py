@@ -7,10 +7,13 @@ import asyncssh
 import asyncio
 import logging
 import hashlib
+import shlex
 from core.utils import _m, get_extra_info
 
 logger = logging.getLogger(__name__)
 
+CHECKSUM_CHUNK_SIZE = 1024 * 1024  # 1 MiB per SFTP read
+
 
 class InteractiveShellService:
     ssh_client: asyncssh.SSHClientConnection
@@ -183,9 +186,37 @@ class InteractiveShellService:
         sha256_hash.update(file_content)
         return sha256_hash.hexdigest()
 
-    async def get_checksums_over_scp(self, file_path: str):
-        file_content = await self.read_file_content_over_scp(file_path)
-        return f"{self.get_md5_checksum_from_file_content(file_content)}:{self.get_sha256_checksum_from_file_content(file_content)}"
+    async def get_checksums_over_scp(self, file_path: str, chunk_size: int = CHECKSUM_CHUNK_SIZE):
+        """Stream the file over SFTP and return "md5:sha256", hashing both in a single pass."""
+        md5_hash = hashlib.md5()
+        sha256_hash = hashlib.sha256()
+
+        async with self.ssh_client.start_sftp_client() as sftp_client:
+            async with sftp_client.open(file_path, 'rb') as file:
+                while True:
+                    chunk = await file.read(chunk_size)
+                    if not chunk:
+                        break
+                    md5_hash.update(chunk)
+                    sha256_hash.update(chunk)
+
+        return f"{md5_hash.hexdigest()}:{sha256_hash.hexdigest()}"
+
+    async def get_salted_sha256_checksum(self, file_path: str, salt: str, timeout: int = 30) -> str:
+        """Run sha256sum on the executor over `salt` followed by the file content.
+
+        The salt is a fresh per-challenge value and is hashed first, so the executor can
+        neither answer with a precomputed string nor extend a stored midstate of the file;
+        the caller compares it with sha256(salt + local_file).
+        """
+        command = (
+            f"{{ printf '%s' {shlex.quote(salt)} && cat {shlex.quote(file_path)}; }} | sha256sum"
+        )
+        result = await self.ssh_client.run(command, timeout=timeout)
+        if result.exit_status != 0 or not result.stdout:
+            raise Exception(f"Failed to calculate checksum of {file_path}: {result.stderr}")
+
+        return result.stdout.split()[0].strip()
 
     # async def get_checksums_by_path(self, file_path: str):
     #     md5_output = await self.exec_shell_command(f'md5sum {file_path}')
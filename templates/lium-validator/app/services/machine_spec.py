@@ -0,0 +1,87 @@
+import json
+
+
+def remap_keys(d: dict, key_mapping: dict, final_mapping: dict) -> dict:
+    """Single recursive pass equivalent to `update_keys(update_keys(d, key_mapping), final_mapping)`.
+
+    Nested values are remapped once. Each level still goes through the first mapping before
+    the second so that keys colliding in the first pass (e.g. several unknown keys mapping to
+    None) resolve to the same value and order as the two-pass version.
+    """
+    first_pass = {}
+    for key, value in d.items():
+        if isinstance(value, dict):
+            value = remap_keys(value, key_mapping, final_mapping)
+        elif isinstance(value, list):
+            value = [
+                remap_keys(item, key_mapping, final_mapping) if isinstance(item, dict) else item
+                for item in value
+            ]
+        first_pass[key_mapping.get(key)] = value
+    return {final_mapping.get(key): value for key, value in first_pass.items()}
+
+
+class MachineSpec:
+    """De-obfuscated machine spec scraped from an executor.
+
+    `data` is the plain dict stored in Redis / sent to the compute app; the remaining
+    attributes are the fields the validator checks, read once at parse time.
+    """
+
+    __slots__ = (
+        "data",
+        "gpu_model",
+        "gpu_count",
+        "gpu_details",
+        "nvidia_driver",
+        "libnvidia_ml",
+        "docker_version",
+        "docker_digest",
+        "ram",
+        "storage",
+        "gpu_processes",
+        "sysbox_runtime",
+        "vram",
+        "gpu_uuids",
+    )
+
+    def __init__(self, data: dict):
+        self.data = data
+
+        gpu = data.get("gpu", {})
+        md5_checksums = data.get("md5_checksums", {})
+
+        self.gpu_count = gpu.get("count", 0)
+        self.gpu_details = gpu.get("details", [])
+        self.gpu_model = None
+        if self.gpu_count > 0 and len(self.gpu_details) > 0:
+            self.gpu_model = self.gpu_details[0].get("name", None)
+
+        self.nvidia_driver = gpu.get("driver", "")
+        self.libnvidia_ml = md5_checksums.get("libnvidia_ml", "")
+
+        self.docker_version = data.get("docker", {}).get("version", "")
+        self.docker_digest = md5_checksums.get("docker", "")
+
+        self.ram = data.get("ram", {}).get("total", 0)
+        self.storage = data.get("hard_disk", {}).get("free", 0)
+        self.gpu_processes = data.get("gpu_processes", [])
+        self.sysbox_runtime = data.get("sysbox_runtime", False)
+
+        vram = 0
+        for detail in self.gpu_details:
+            vram += detail.get("capacity", 0) * 1024
+        self.vram = vram
+
+        self.gpu_uuids = ','.join([detail.get('uuid', '') for detail in self.gpu_details])
+
+    @property
+    def gpu_model_count(self) -> str:
+        return f'{self.gpu_model}:{self.gpu_count}'
+
+    @classmethod
+    def parse(cls, payload: str, all_keys: dict, original_keys: dict) -> "MachineSpec":
+        """Parse the decrypted scrape output and undo the key obfuscation in one pass."""
+        reverse_all_keys = {v: k for k, v in all_keys.items()}
+        return cls(remap_keys(json.loads(payload), reverse_all_keys, original_keys))
+
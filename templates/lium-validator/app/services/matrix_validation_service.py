@@ -1,11 +1,26 @@
+import asyncio
 import time
 import random
 import logging
 import json 
 import os
 import uuid as uuid4
+from collections import OrderedDict, deque
 from dataclasses import dataclass
+
+import asyncssh
+from core.config import settings
 from core.utils import _m, get_extra_info
+from services.const import (
+    NATIVE_HANDLE_POOL_SIZE,
+    MATRIX_CHALLENGE_QUEUE_DEPTH,
+    MATRIX_CHALLENGE_QUEUE_MAX_KEYS,
+    MATRIX_CHALLENGE_TTL_SECONDS,
+    MATRIX_CHALLENGE_REFILL_CONCURRENCY,
+    MATRIX_CHALLENGE_BASE_TIMEOUT_SECONDS,
+    MATRIX_CHALLENGE_TIMEOUT_PER_1K_DIM_K_MS,
+)
+from services.native_handle_pool import NativeHandlePool
 from ctypes import CDLL, c_longlong, POINTER, c_void_p, c_char_p
 
 logger = logging.getLogger(__name__)
@@ -103,25 +118,85 @@ class VerifierParams:
         return f"--dim_n {self.dim_n} --dim_k {self.dim_k} --seed {self.seed} --cipher_text {self.cipher_text}"
     
 
+class ChallengeQueue:
+    """Ready-to-send matrix challenges, bucketed by (gpu_memory, machine_info).
+
+    The cipher text binds the executor's GPU UUIDs, so a challenge can only be reused for
+    the machine it was generated for; the bucket key keeps that pairing. Entries expire
+    after `ttl` seconds and the least recently used buckets are dropped past `max_keys`.
+    """
+
+    def __init__(self, depth: int, ttl: float, max_keys: int):
+        self.depth = depth
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[tuple, deque] = OrderedDict()
+
+    def pop(self, key: tuple):
+        bucket = self._buckets.get(key)
+        if not bucket:
+            return None
+        self._buckets.move_to_end(key)
+
+        now = time.monotonic()
+        while bucket:
+            created_at, verifier_params = bucket.popleft()
+            if now - created_at < self.ttl:
+                return verifier_params
+        return None
+
+    def missing(self, key: tuple) -> int:
+        bucket = self._buckets.get(key)
+        return self.depth - (len(bucket) if bucket else 0)
+
+    def push(self, key: tuple, verifier_params: "VerifierParams"):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = deque(maxlen=self.depth)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        self._buckets.move_to_end(key)
+        bucket.append((time.monotonic(), verifier_params))
+
+
 class ValidationService:
     def __init__(self):
         """
         Constructor, differentiate miner vs validator libs.
         """
         self.wrapper = DMCompVerifyWrapper("/usr/lib/libdmcompverify.so")
-        self.verifier_ptr = self.wrapper.DMCompVerify_new(10, 10)
-
-    def encrypt_challenge(self, m_dim_n, m_dim_k, seed, machine_info, uuid):
+        # DMCompVerify objects are reused across challenges; each one is leased by a single
+        # challenge at a time so concurrent generations never share native state.
+        self.verifier_pool = NativeHandlePool(
+            lambda: self.wrapper.DMCompVerify_new(10, 10),
+            size=NATIVE_HANDLE_POOL_SIZE,
+        )
+        self.challenge_queue = ChallengeQueue(
+            depth=MATRIX_CHALLENGE_QUEUE_DEPTH,
+            ttl=MATRIX_CHALLENGE_TTL_SECONDS,
+            max_keys=MATRIX_CHALLENGE_QUEUE_MAX_KEYS,
+        )
+        self._refill_tasks: dict[tuple, asyncio.Task] = {}
+        # Refills are background work: they must not take verifiers from live challenges
+        self._refill_semaphore = asyncio.Semaphore(MATRIX_CHALLENGE_REFILL_CONCURRENCY)
+
+    def _encrypt_challenge(self, verifier_ptr, m_dim_n, m_dim_k, seed, machine_info, uuid):
+        self.wrapper.setDimension(verifier_ptr, m_dim_n, m_dim_k)
+
+        self.wrapper.generateChallenge(verifier_ptr, seed, machine_info, uuid)
+
+        cipher_text = self.wrapper.getCipherText(verifier_ptr)
+        print("Encrypt Challenge Cipher Text:", cipher_text)
+        return cipher_text
+
+    async def encrypt_challenge(self, m_dim_n, m_dim_k, seed, machine_info, uuid):
+        """Generate the cipher text on a pooled verifier, off the event loop."""
         try:
-            # Example of usage:
-            # Create a new DMCompVerify object
-            self.wrapper.setDimension(self.verifier_ptr, m_dim_n, m_dim_k)
-
-            self.wrapper.generateChallenge(self.verifier_ptr, seed, machine_info, uuid)
-
-            cipher_text = self.wrapper.getCipherText(self.verifier_ptr)
-            print("Encrypt Challenge Cipher Text:", cipher_text)
-            return cipher_text
+            async with self.verifier_pool.acquire() as verifier_ptr:
+                return await self.verifier_pool.run(
+                    verifier_ptr,
+                    self._encrypt_challenge, verifier_ptr, m_dim_n, m_dim_k, seed, machine_info, uuid,
+                )
         except Exception as e:
             logger.error("Failed encrypt challenge request: %s", str(e))
             return ""
@@ -159,6 +234,84 @@ class ValidationService:
 
         return max_dim_k
 
+    async def generate_verifier_params(self, gpu_memory, machine_info: str) -> VerifierParams:
+        verifier_params = VerifierParams()
+        verifier_params.generate()
+        verifier_params.dim_k = int(self.get_max_matrix_dimensions(gpu_memory, verifier_params.dim_n))
+
+        verifier_params.cipher_text = await self.encrypt_challenge(
+            verifier_params.dim_n,
+            verifier_params.dim_k,
+            verifier_params.seed,
+            machine_info,
+            verifier_params.uuid,
+        )
+        return verifier_params
+
+    async def _refill_challenges(self, key: tuple):
+        try:
+            async with self._refill_semaphore:
+                while self.challenge_queue.missing(key) > 0:
+                    if not self.verifier_pool.has_idle_handle():
+                        # Foreground generations are using every verifier; the next
+                        # validation of this machine schedules the refill again.
+                        break
+                    verifier_params = await self.generate_verifier_params(*key)
+                    if not verifier_params.cipher_text:
+                        break
+                    self.challenge_queue.push(key, verifier_params)
+        except Exception as e:
+            logger.error("Failed to precompute matrix challenge: %s", str(e))
+        finally:
+            self._refill_tasks.pop(key, None)
+
+    def schedule_challenge_refill(self, gpu_memory, machine_info: str):
+        key = (gpu_memory, machine_info)
+        if key not in self._refill_tasks:
+            self._refill_tasks[key] = asyncio.create_task(self._refill_challenges(key))
+
+    async def get_verifier_params(self, gpu_memory, machine_info: str) -> VerifierParams:
+        """Pop a precomputed challenge for this machine, generating inline on a miss.
+
+        Either way a background refill is scheduled, so the next validation of the same
+        machine finds its challenge ready. Refills run one at a time and only while a
+        verifier is idle, so under load live challenges are not queued behind them.
+        """
+        verifier_params = self.challenge_queue.pop((gpu_memory, machine_info))
+        if verifier_params is None:
+            verifier_params = await self.generate_verifier_params(gpu_memory, machine_info)
+
+        self.schedule_challenge_refill(gpu_memory, machine_info)
+        return verifier_params
+
+    def get_challenge_timeout(self, dim_k: int) -> float:
+        """Deadline for decrypt_challenge.py, scaled to dim_k once a per-1024 rate is configured."""
+        job_timeout = settings.JOB_TIME_OUT - 60
+        rate_ms = getattr(settings, "MATRIX_CHALLENGE_TIMEOUT_PER_1K_DIM_K_MS", MATRIX_CHALLENGE_TIMEOUT_PER_1K_DIM_K_MS)
+        if rate_ms is None:
+            return job_timeout
+        timeout = MATRIX_CHALLENGE_BASE_TIMEOUT_SECONDS + rate_ms * dim_k / 1024 / 1000
+        return min(timeout, job_timeout)
+
+    async def _read_challenge_uuid(self, ssh_client, command: str) -> str:
+        """Run the challenge script and return the value of its first `UUID:` line ("" if none).
+
+        Without a PTY, closing the channel doesn't stop the remote script, which would keep
+        the GPU busy during the checks that follow: it is killed if we stop reading early.
+        """
+        async with ssh_client.create_process(command, stderr=asyncssh.DEVNULL) as process:
+            try:
+                async for line in process.stdout:
+                    if line.startswith("UUID:"):
+                        return line.split("UUID:")[1].strip()
+            finally:
+                if process.exit_status is None:
+                    try:
+                        process.kill()
+                    except (OSError, asyncssh.Error):
+                        pass
+        return ""
+
     async def validate_gpu_model_and_process_job(
         self,
         ssh_client,
@@ -182,21 +335,12 @@ class ValidationService:
             gpu_info = {"uuids": gpu_uuids, "gpu_count": gpu_count, "gpu_model": gpu_model}
             machine_info = json.dumps(gpu_info, sort_keys=True)
 
-            verifier_params = VerifierParams()
-            verifier_params.generate()
             gpu_memory = self.get_gpu_memory(machine_spec)
-            verifier_params.dim_k = int(self.get_max_matrix_dimensions(gpu_memory, verifier_params.dim_n))
+            verifier_params = await self.get_verifier_params(gpu_memory, machine_info)
 
-            verifier_params.cipher_text = self.encrypt_challenge(
-                verifier_params.dim_n,
-                verifier_params.dim_k,
-                verifier_params.seed,
-                machine_info,
-                verifier_params.uuid,
-            )
-
-            print("verifier_params", verifier_params)
-            command = f"{executor_info.python_path} {script_path} {verifier_params}"
+            timeout = self.get_challenge_timeout(verifier_params.dim_k)
+            # `timeout` also stops the script if the kill signal doesn't reach it
+            command = f"timeout {int(timeout) + 1} {executor_info.python_path} {script_path} {verifier_params}"
 
             log_extra = {
                 **default_extra,
@@ -210,31 +354,19 @@ class ValidationService:
 
             logger.info(_m("Matrix Multiplication Python Script Command", extra=get_extra_info(log_extra)))
 
-            # Run the script
-            try:
-                result = await ssh_client.run(command)
-            except Exception as e:
-                logger.error(_m("Failed to execute SSH command", extra=get_extra_info(log_extra)))
-                return False
-
-            logger.info(f"{script_path}: {result}")
-
-            if result is None:
-                logger.warning(_m("GPU model validation job failed", extra=get_extra_info(log_extra)))
-                return False
-
+            # Run the script, reading stdout only until the UUID line shows up
             try:
-                stdout = result.stdout.strip()
-            except AttributeError as e:
-                logger.error(_m("Result object missing stdout attribute", extra=get_extra_info(log_extra)))
+                uuid = await asyncio.wait_for(self._read_challenge_uuid(ssh_client, command), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    _m(
+                        "GPU model validation job timed out",
+                        extra=get_extra_info({**log_extra, "timeout": timeout}),
+                    )
+                )
                 return False
-
-            # Extract UUID from stdout
-            try:
-                uuid_line = next((line for line in stdout.splitlines() if line.startswith("UUID:")), None)
-                uuid = uuid_line.split("UUID:")[1].strip() if uuid_line else ""
             except Exception as e:
-                logger.error(_m("Failed to extract UUID from stdout", extra=get_extra_info(log_extra)))
+                logger.error(_m("Failed to execute SSH command", extra=get_extra_info({**log_extra, "error": str(e)})))
                 return False
 
             try:
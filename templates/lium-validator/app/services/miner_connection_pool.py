@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+
+import bittensor
+from clients.miner_client import MinerClient
+
+from services.const import (
+    MINER_CONNECTION_IDLE_SECONDS,
+    MINER_CONNECTION_PING_AFTER_IDLE_SECONDS,
+    MINER_CONNECTION_PING_TIMEOUT,
+    MINER_CONNECTION_SWEEP_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class _MinerConnection:
+    def __init__(self, client: MinerClient):
+        self.client = client
+        self.exit_stack = AsyncExitStack()
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+
+    async def open(self):
+        await self.exit_stack.enter_async_context(self.client)
+
+    async def close(self):
+        try:
+            await self.exit_stack.aclose()
+        except Exception as e:
+            logger.warning(f"Failed to close connection to miner {self.client.miner_hotkey}: {e}")
+
+    def is_open(self) -> bool:
+        ws = getattr(self.client, "ws", None)
+        return ws is not None and ws.close_code is None
+
+    async def is_alive(self) -> bool:
+        """Whether the websocket is open and, after a while idle, still answers a ping."""
+        if not self.is_open():
+            return False
+        if time.monotonic() - self.last_used < MINER_CONNECTION_PING_AFTER_IDLE_SECONDS:
+            return True
+        try:
+            pong_waiter = await self.client.ws.ping()
+            await asyncio.wait_for(pong_waiter, MINER_CONNECTION_PING_TIMEOUT)
+        except Exception:
+            return False
+        return True
+
+
+class MinerConnectionPool:
+    """Keeps one open websocket per miner and lends it to MinerService operations.
+
+    The miner protocol has no request ids: every MinerService operation sends a request and
+    awaits the reply on `job_state.miner_accepted_ssh_key_or_failed_future`. A connection
+    therefore carries one operation at a time and gets a fresh reply future before each
+    lease. An operation that finds the pooled connection busy gets a dedicated connection
+    for its own duration instead of waiting for it.
+
+    A pooled connection whose websocket was closed, or that was idle for a while and doesn't
+    answer a ping (e.g. a half-open socket dropped by a NAT), is replaced before it is lent.
+    Connections are closed after MINER_CONNECTION_IDLE_SECONDS
+    without use, and when an operation raised or gave up waiting for its reply, since the late
+    reply could land on the next operation.
+    """
+
+    def __init__(self):
+        self._connections: dict[tuple[str, int, str], _MinerConnection] = {}
+        self._sweep_task: asyncio.Task | None = None
+
+    @staticmethod
+    def _new_client(
+        loop: asyncio.AbstractEventLoop,
+        miner_address: str,
+        miner_port: int,
+        miner_hotkey: str,
+        keypair: bittensor.Keypair,
+    ) -> MinerClient:
+        return MinerClient(
+            loop=loop,
+            miner_address=miner_address,
+            miner_port=miner_port,
+            miner_hotkey=miner_hotkey,
+            my_hotkey=keypair.ss58_address,
+            keypair=keypair,
+            miner_url=f"ws://{miner_address}:{miner_port}/websocket/{keypair.ss58_address}",
+        )
+
+    def _evict(self, key: tuple[str, int, str], connection: _MinerConnection):
+        if self._connections.get(key) is connection:
+            del self._connections[key]
+
+    async def _checkout(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        miner_address: str,
+        miner_port: int,
+        miner_hotkey: str,
+        keypair: bittensor.Keypair,
+    ) -> _MinerConnection | None:
+        """Return the pooled connection with its lock held, or None if the pool can't lend one now."""
+        key = (miner_address, miner_port, miner_hotkey)
+        connection = self._connections.get(key)
+
+        if connection is not None:
+            if connection.lock.locked():
+                return None
+
+            await connection.lock.acquire()
+            try:
+                is_alive = await connection.is_alive()
+            except BaseException:
+                connection.lock.release()
+                raise
+            if is_alive:
+                return connection
+
+            logger.info(f"Pooled connection to miner {miner_hotkey} stopped answering, reconnecting")
+            self._evict(key, connection)
+            try:
+                await connection.close()
+            finally:
+                connection.lock.release()
+
+            # A concurrent lease may have pooled its own connection while this one was closing
+            if key in self._connections:
+                return None
+
+        connection = _MinerConnection(
+            self._new_client(loop, miner_address, miner_port, miner_hotkey, keypair)
+        )
+        self._connections[key] = connection
+        await connection.lock.acquire()
+        try:
+            await connection.open()
+        except BaseException:
+            self._evict(key, connection)
+            connection.lock.release()
+            await connection.close()
+            raise
+        self._start_sweep()
+        return connection
+
+    @asynccontextmanager
+    async def lease(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        miner_address: str,
+        miner_port: int,
+        miner_hotkey: str,
+        keypair: bittensor.Keypair,
+    ):
+        key = (miner_address, miner_port, miner_hotkey)
+        connection = await self._checkout(loop, miner_address, miner_port, miner_hotkey, keypair)
+
+        if connection is None:
+            # Busy with another operation: use a connection of our own, as before pooling
+            miner_client = self._new_client(loop, miner_address, miner_port, miner_hotkey, keypair)
+            async with miner_client:
+                yield miner_client
+            return
+
+        try:
+            reply_future = loop.create_future()
+            connection.client.job_state.miner_accepted_ssh_key_or_failed_future = reply_future
+            try:
+                yield connection.client
+            except BaseException:
+                self._evict(key, connection)
+                await connection.close()
+                raise
+
+            connection.last_used = time.monotonic()
+            # wait_for cancels the reply future it timed out on; the reply may still arrive
+            if reply_future.cancelled():
+                self._evict(key, connection)
+                await connection.close()
+        finally:
+            connection.lock.release()
+
+    def _start_sweep(self):
+        if self._sweep_task is None or self._sweep_task.done():
+            self._sweep_task = asyncio.create_task(self._sweep())
+
+    async def _sweep(self):
+        while self._connections:
+            await asyncio.sleep(MINER_CONNECTION_SWEEP_SECONDS)
+
+            now = time.monotonic()
+            for key, connection in list(self._connections.items()):
+                if connection.lock.locked():
+                    continue
+                if now - connection.last_used > MINER_CONNECTION_IDLE_SECONDS or not connection.is_open():
+                    self._evict(key, connection)
+                    async with connection.lock:
+                        await connection.close()
+
+
+miner_connection_pool = MinerConnectionPool()
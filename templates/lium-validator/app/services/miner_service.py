@@ -2,12 +2,13 @@ import asyncio
 import json
 import logging
 import os
+import time
+from contextlib import asynccontextmanager
 from typing import Annotated
 
 from asyncssh import SSHKey
 import asyncssh
 import bittensor
-from clients.miner_client import MinerClient
 from daos.port_mapping_dao import PortMappingDao
 from datura.requests.miner_requests import (
     AcceptSSHKeyRequest,
@@ -45,7 +46,14 @@ from payload_models.payloads import (
 
 from core.config import settings
 from core.utils import _m, get_extra_info
-from services.docker_service import DockerService
+from services.const import (
+    JOB_MAX_CONCURRENT_EXECUTORS,
+    JOB_MAX_CONCURRENT_EXECUTORS_PER_MINER,
+    JOB_MIN_EXECUTOR_RUN_SECONDS,
+    MACHINE_SPEC_PUBLISH_BATCH_SECONDS,
+)
+from services.docker_service import POD_LOGS_MAX_TAIL, DockerService
+from services.miner_connection_pool import miner_connection_pool
 from services.redis_service import MACHINE_SPEC_CHANNEL, RedisService
 from services.ssh_service import SSHService
 from services.task_service import TaskService, JobResult
@@ -55,6 +63,13 @@ logger = logging.getLogger(__name__)
 
 JOB_LENGTH = 30
 
+# Shared by every job request of this validator process
+_executor_job_semaphore = asyncio.Semaphore(
+    getattr(settings, "JOB_MAX_CONCURRENT_EXECUTORS", JOB_MAX_CONCURRENT_EXECUTORS)
+)
+# executor uuid -> seconds its last create_task ran, used to start expensive executors first
+_executor_job_durations: dict[str, float] = {}
+
 
 class MinerService:
     def __init__(
@@ -69,6 +84,59 @@ class MinerService:
         self.redis_service = redis_service
         self.port_mapping_dao = port_mapping_dao
 
+    async def _run_executor_task(
+        self,
+        semaphore: asyncio.Semaphore,
+        executor_info: ExecutorSSHInfo,
+        deadline: float,
+        timings: list[tuple[float, float]],
+        skipped: list[str],
+        default_extra: dict,
+        **kwargs,
+    ):
+        """Run create_task once a per-miner and a global slot are free, within the job's deadline.
+
+        The caller's timeout covers the queue wait and the run together. An executor whose
+        slot frees up with less than JOB_MIN_EXECUTOR_RUN_SECONDS left is skipped and its
+        uuid added to `skipped`.
+        """
+        min_run_seconds = getattr(settings, "JOB_MIN_EXECUTOR_RUN_SECONDS", JOB_MIN_EXECUTOR_RUN_SECONDS)
+        queued_at = time.monotonic()
+        async with semaphore, _executor_job_semaphore:
+            started_at = time.monotonic()
+            if deadline - started_at < min_run_seconds:
+                skipped.append(executor_info.uuid)
+                logger.warning(
+                    _m(
+                        "Skipped executor task, not enough time left in the job",
+                        extra=get_extra_info({
+                            **default_extra,
+                            "executor_uuid": executor_info.uuid,
+                            "queue_wait": round(started_at - queued_at, 2),
+                        }),
+                    ),
+                )
+                return None
+
+            try:
+                return await self.task_service.create_task(executor_info=executor_info, **kwargs)
+            finally:
+                queue_wait = started_at - queued_at
+                execution_time = time.monotonic() - started_at
+                _executor_job_durations[executor_info.uuid] = execution_time
+                timings.append((queue_wait, execution_time))
+                logger.info(
+                    _m(
+                        "Executor task finished",
+                        extra=get_extra_info({
+                            **default_extra,
+                            "executor_uuid": executor_info.uuid,
+                            "queue_wait": round(queue_wait, 2),
+                            "execution_time": round(execution_time, 2),
+                        }),
+                    ),
+                )
+
     async def request_job_to_miner(
         self,
         payload: MinerJobRequestPayload,
@@ -86,17 +154,13 @@ class MinerService:
         try:
             logger.info(_m("Requesting job to miner", extra=get_extra_info(default_extra)))
 
-            miner_client = MinerClient(
+            async with miner_connection_pool.lease(
                 loop=loop,
                 miner_address=payload.miner_address,
                 miner_port=payload.miner_port,
                 miner_hotkey=payload.miner_hotkey,
-                my_hotkey=my_key.ss58_address,
                 keypair=my_key,
-                miner_url=f"ws://{payload.miner_address}:{payload.miner_port}/websocket/{my_key.ss58_address}"
-            )
-
-            async with miner_client:
+            ) as miner_client:
                 # generate ssh key and send it to miner
                 private_key, public_key = self.ssh_service.generate_ssh_key(my_key.ss58_address)
 
@@ -135,40 +199,100 @@ class MinerService:
                     if len(msg.executors) == 0:
                         return None
 
+                    # Longest last run first, unseen executors before all of them, so slow executors
+                    # do not end up queued behind fast ones at the tail of the job
+                    executors = sorted(
+                        msg.executors,
+                        key=lambda executor_info: _executor_job_durations.get(executor_info.uuid, float("inf")),
+                        reverse=True,
+                    )
+
+                    # Collateral of every executor is read once here, in start order, and shared with the
+                    # executor tasks, which only need it after scraping the machine spec
+                    collateral_prefetch = self.task_service.collateral_contract_service.prefetch_miner_collateral(
+                        miner_hotkey=payload.miner_hotkey,
+                        executor_uuids=[executor_info.uuid for executor_info in executors],
+                    )
+                    semaphore = asyncio.Semaphore(
+                        getattr(settings, "JOB_MAX_CONCURRENT_EXECUTORS_PER_MINER", JOB_MAX_CONCURRENT_EXECUTORS_PER_MINER)
+                    )
+                    timings: list[tuple[float, float]] = []
+                    skipped: list[str] = []
+                    # One deadline for the whole job: queued executors don't get a fresh timeout
+                    job_timeout = settings.JOB_TIME_OUT - 60
+                    deadline = time.monotonic() + job_timeout
+
                     tasks = [
                         asyncio.create_task(
                             asyncio.wait_for(
-                                self.task_service.create_task(
-                                    miner_info=payload,
+                                self._run_executor_task(
+                                    semaphore=semaphore,
                                     executor_info=executor_info,
+                                    deadline=deadline,
+                                    timings=timings,
+                                    skipped=skipped,
+                                    default_extra=default_extra,
+                                    miner_info=payload,
                                     keypair=my_key,
                                     private_key=private_key.decode("utf-8"),
                                     public_key=public_key.decode("utf-8"),
                                     encrypted_files=encrypted_files,
+                                    collateral_prefetch=collateral_prefetch,
                                 ),
-                                timeout=settings.JOB_TIME_OUT - 60
+                                timeout=job_timeout,
                             )
                         )
-                        for executor_info in msg.executors
+                        for executor_info in executors
                     ]
 
-                    results = [
-                        result
-                        for result in await asyncio.gather(*tasks, return_exceptions=True)
-                        if result and not isinstance(result, Exception) and not isinstance(result, BaseException)
+                    try:
+                        results = await self.publish_machine_specs_as_completed(
+                            tasks, miner_client.miner_hotkey, payload.miner_coldkey
+                        )
+                    finally:
+                        prefetch_tasks = collateral_prefetch.tasks()
+                        for prefetch_task in prefetch_tasks:
+                            prefetch_task.cancel()
+                        await asyncio.gather(*prefetch_tasks, return_exceptions=True)
+
+                    timed_out = [
+                        executor_info.uuid
+                        for executor_info, task in zip(executors, tasks)
+                        if task.done()
+                        and not task.cancelled()
+                        and isinstance(task.exception(), asyncio.TimeoutError)
                     ]
+                    if skipped or timed_out:
+                        logger.warning(
+                            _m(
+                                "Executors got no result before the job deadline",
+                                extra=get_extra_info({
+                                    **default_extra,
+                                    "skipped_executors": skipped,
+                                    "timed_out_executors": timed_out,
+                                }),
+                            ),
+                        )
 
                     logger.info(
                         _m(
                             "Finished running tasks for executors",
-                            extra=get_extra_info({**default_extra, "executors": len(results)}),
+                            extra=get_extra_info({
+                                **default_extra,
+                                "executors": len(results),
+                                "executors_requested": len(executors),
+                                "executors_skipped": len(skipped),
+                                "executors_timed_out": len(timed_out),
+                                "queue_wait_max": round(max((t[0] for t in timings), default=0), 2),
+                                "queue_wait_total": round(sum(t[0] for t in timings), 2),
+                                "execution_time_max": round(max((t[1] for t in timings), default=0), 2),
+                                "execution_time_total": round(sum(t[1] for t in timings), 2),
+                            }),
                         ),
                     )
 
                     await miner_client.send_model(SSHPubKeyRemoveRequest(public_key=public_key))
 
-                    await self.publish_machine_specs(results, miner_client.miner_hotkey, payload.miner_coldkey)
-
                     return {
                         "miner_hotkey": payload.miner_hotkey,
                         "results": [result for result in results if result.gpu_model is not None and result.gpu_count > 0],
@@ -216,6 +340,37 @@ class MinerService:
             )
             return None
 
+    async def publish_machine_specs_as_completed(
+        self, tasks: list[asyncio.Task], miner_hotkey: str, miner_coldkey: str
+    ) -> list[JobResult]:
+        """Publish executor results in micro-batches as their tasks finish and return all of them.
+
+        After the first task of a batch completes, others finishing within
+        MACHINE_SPEC_PUBLISH_BATCH_SECONDS are published along with it.
+        """
+        results = []
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if pending:
+                    more, pending = await asyncio.wait(pending, timeout=MACHINE_SPEC_PUBLISH_BATCH_SECONDS)
+                    done |= more
+
+                batch = [
+                    task.result()
+                    for task in done
+                    if not task.cancelled() and task.exception() is None and task.result()
+                ]
+                if batch:
+                    results.extend(batch)
+                    await self.publish_machine_specs(batch, miner_hotkey, miner_coldkey)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        return results
+
     async def publish_machine_specs(
         self, results: list[JobResult], miner_hotkey: str, miner_coldkey: str
     ):
@@ -315,17 +470,13 @@ class MinerService:
         )
 
         try:
-            miner_client = MinerClient(
+            async with miner_connection_pool.lease(
                 loop=loop,
                 miner_address=payload.miner_address,
                 miner_port=payload.miner_port,
                 miner_hotkey=payload.miner_hotkey,
-                my_hotkey=my_key.ss58_address,
                 keypair=my_key,
-                miner_url=f"ws://{payload.miner_address}:{payload.miner_port}/websocket/{my_key.ss58_address}",
-            )
-
-            async with miner_client:
+            ) as miner_client:
                 # generate ssh key and send it to miner
                 private_key, public_key = self.ssh_service.generate_ssh_key(my_key.ss58_address)
 
@@ -566,7 +717,69 @@ class MinerService:
                 error_code=FailedContainerErrorCodes.ExceptionError,
             )
 
-    async def get_pod_logs(self, payload: GetPodLogsRequestFromServer) -> PodLogsResponseToServer:
+    @asynccontextmanager
+    async def _executor_ssh_access(self, payload: GetPodLogsRequestFromServer, my_key: bittensor.Keypair):
+        """Have the miner accept a temporary SSH key for the executor and remove it on exit.
+
+        The miner connection is only leased for the key exchange, not while the key is in use.
+        Yields the executor's SSH info and the encrypted private key.
+        """
+        loop = asyncio.get_event_loop()
+        private_key, public_key = self.ssh_service.generate_ssh_key(my_key.ss58_address)
+
+        async with miner_connection_pool.lease(
+            loop=loop,
+            miner_address=payload.miner_address,
+            miner_port=payload.miner_port,
+            miner_hotkey=payload.miner_hotkey,
+            keypair=my_key,
+        ) as miner_client:
+            await miner_client.send_model(
+                SSHPubKeySubmitRequest(
+                    public_key=public_key,
+                    executor_id=payload.executor_id,
+                    is_rental_request=False,
+                )
+            )
+            msg = await asyncio.wait_for(
+                miner_client.job_state.miner_accepted_ssh_key_or_failed_future,
+                timeout=JOB_LENGTH,
+            )
+
+        if not isinstance(msg, AcceptSSHKeyRequest):
+            raise Exception(f"Miner did not accept SSH key: {msg}")
+
+        try:
+            executor = msg.executors[0] if msg.executors else None
+            if executor is None or executor.uuid != payload.executor_id:
+                raise Exception("Invalid executor id")
+
+            yield executor, private_key.decode("utf-8")
+        finally:
+            async with miner_connection_pool.lease(
+                loop=loop,
+                miner_address=payload.miner_address,
+                miner_port=payload.miner_port,
+                miner_hotkey=payload.miner_hotkey,
+                keypair=my_key,
+            ) as miner_client:
+                await miner_client.send_model(
+                    SSHPubKeyRemoveRequest(public_key=public_key, executor_id=payload.executor_id)
+                )
+
+    async def get_pod_logs(
+        self,
+        payload: GetPodLogsRequestFromServer,
+        since: str | None = None,
+        tail: int | None = None,
+    ) -> PodLogsResponseToServer:
+        """Get the pod's logs through the miner.
+
+        With `since` (the timestamp of the last entry already received) or `tail`, only newer
+        lines are read straight from the executor with `docker logs --since --tail`, each entry
+        carrying its timestamp to be passed as the next cursor. Callers polling repeatedly
+        should hold a `pod_logs_session` instead, which sets up executor access only once.
+        """
         loop = asyncio.get_event_loop()
         my_key: bittensor.Keypair = settings.get_bittensor_wallet().get_hotkey()
         default_extra = {
@@ -577,18 +790,17 @@ class MinerService:
             "container_name": payload.container_name,
         }
 
+        if since is not None or tail is not None:
+            return await self._get_pod_logs_incremental(payload, default_extra, since, tail)
+
         try:
-            miner_client = MinerClient(
+            async with miner_connection_pool.lease(
                 loop=loop,
                 miner_address=payload.miner_address,
                 miner_port=payload.miner_port,
                 miner_hotkey=payload.miner_hotkey,
-                my_hotkey=my_key.ss58_address,
                 keypair=my_key,
-                miner_url=f"ws://{payload.miner_address}:{payload.miner_port}/websocket/{my_key.ss58_address}",
-            )
-
-            async with miner_client:
+            ) as miner_client:
                 # generate ssh key and send it to miner
                 await miner_client.send_model(
                     GetPodLogsRequest(container_name=payload.container_name, executor_id=payload.executor_id)
@@ -659,6 +871,113 @@ class MinerService:
                 msg=str(log_text),
             )
 
+    @asynccontextmanager
+    async def pod_logs_session(self, payload: GetPodLogsRequestFromServer):
+        """Yield `read(since, tail)`, which reads new lines of the pod's logs from the executor.
+
+        The miner accepts one temporary SSH key and one SSH connection to the executor is kept
+        for the whole session, so each read only runs `docker logs --since --tail`.
+        """
+        my_key: bittensor.Keypair = settings.get_bittensor_wallet().get_hotkey()
+        docker_service = DockerService(
+            ssh_service=self.ssh_service,
+            redis_service=self.redis_service,
+            port_mapping_dao=self.port_mapping_dao
+        )
+
+        async with self._executor_ssh_access(payload, my_key) as (executor, private_key):
+            async with docker_service.container_logs_reader(
+                executor, my_key, private_key, payload.container_name
+            ) as read:
+                yield read
+
+    async def _get_pod_logs_incremental(
+        self,
+        payload: GetPodLogsRequestFromServer,
+        default_extra: dict,
+        since: str | None,
+        tail: int | None,
+    ) -> PodLogsResponseToServer:
+        try:
+            async with self.pod_logs_session(payload) as read:
+                logs = await read(since, tail or POD_LOGS_MAX_TAIL)
+
+            logger.info(
+                _m(
+                    "Pod Log result",
+                    extra=get_extra_info({**default_extra, "logs": len(logs), "since": since}),
+                )
+            )
+            return PodLogsResponseToServer(
+                miner_hotkey=payload.miner_hotkey,
+                executor_id=payload.executor_id,
+                container_name=payload.container_name,
+                logs=logs
+            )
+        except Exception as e:
+            log_text = _m(
+                "Resulted in an exception",
+                extra=get_extra_info({**default_extra, "error": str(e)}),
+            )
+            logger.error(log_text)
+
+            return FailedGetPodLogs(
+                miner_hotkey=payload.miner_hotkey,
+                executor_id=payload.executor_id,
+                container_name=payload.container_name,
+                msg=str(log_text),
+            )
+
+    async def stream_pod_logs(
+        self,
+        payload: GetPodLogsRequestFromServer,
+        since: str | None = None,
+        tail: int = POD_LOGS_MAX_TAIL,
+    ):
+        """Follow the pod's logs, yielding a PodLogsResponseToServer per chunk of new lines.
+
+        Ends with a FailedGetPodLogs if the executor cannot be reached or the stream breaks.
+        """
+        my_key: bittensor.Keypair = settings.get_bittensor_wallet().get_hotkey()
+        default_extra = {
+            "miner_hotkey": payload.miner_hotkey,
+            "executor_id": payload.executor_id,
+            "executor_ip": payload.miner_address,
+            "executor_port": payload.miner_port,
+            "container_name": payload.container_name,
+        }
+        docker_service = DockerService(
+            ssh_service=self.ssh_service,
+            redis_service=self.redis_service,
+            port_mapping_dao=self.port_mapping_dao
+        )
+
+        try:
+            async with self._executor_ssh_access(payload, my_key) as (executor, private_key):
+                logger.info(_m("Streaming logs from executor", extra=get_extra_info(default_extra)))
+                async for logs in docker_service.stream_container_logs(
+                    executor, my_key, private_key, payload.container_name, since=since, tail=tail
+                ):
+                    yield PodLogsResponseToServer(
+                        miner_hotkey=payload.miner_hotkey,
+                        executor_id=payload.executor_id,
+                        container_name=payload.container_name,
+                        logs=logs
+                    )
+        except Exception as e:
+            log_text = _m(
+                "Resulted in an exception",
+                extra=get_extra_info({**default_extra, "error": str(e)}),
+            )
+            logger.error(log_text)
+
+            yield FailedGetPodLogs(
+                miner_hotkey=payload.miner_hotkey,
+                executor_id=payload.executor_id,
+                container_name=payload.container_name,
+                msg=str(log_text),
+            )
+
     async def add_debug_ssh_key(self, payload: AddDebugSshKeyRequest) -> DebugSshKeyAdded:
         loop = asyncio.get_event_loop()
         my_key: bittensor.Keypair = settings.get_bittensor_wallet().get_hotkey()
@@ -670,17 +989,13 @@ class MinerService:
         }
 
         try:
-            miner_client = MinerClient(
+            async with miner_connection_pool.lease(
                 loop=loop,
                 miner_address=payload.miner_address,
                 miner_port=payload.miner_port,
                 miner_hotkey=payload.miner_hotkey,
-                my_hotkey=my_key.ss58_address,
                 keypair=my_key,
-                miner_url=f"ws://{payload.miner_address}:{payload.miner_port}/websocket/{my_key.ss58_address}",
-            )
-
-            async with miner_client:
+            ) as miner_client:
                 await miner_client.send_model(
                     SSHPubKeySubmitRequest(
                         public_key=payload.public_key,
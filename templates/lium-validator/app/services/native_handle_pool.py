@@ -0,0 +1,94 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, Callable
+
+
+class NativeHandlePool:
+    """Bounded pool of pre-initialised native handles (DMCompVerify / VerifyX objects).
+
+    Handles are created lazily in a worker thread, up to `size`. When every handle is
+    leased, callers either wait for one to be released or, with `overflow=True`, get a
+    temporary handle that is dropped (and freed by its owner) on release instead of
+    being pooled.
+
+    Blocking calls on a leased handle go through `run`, so a lease released by a
+    cancelled caller only goes back to the pool once its worker thread has finished.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        size: int,
+        overflow: bool = False,
+    ):
+        self.factory = factory
+        self.size = size
+        self.overflow = overflow
+        self._idle: asyncio.LifoQueue = asyncio.LifoQueue(maxsize=size)
+        self._created = 0
+        # id(handle) -> worker-thread call still running on that leased handle
+        self._running: dict[int, asyncio.Future] = {}
+
+    async def _get(self):
+        try:
+            return self._idle.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+
+        if self._created < self.size:
+            self._created += 1
+            try:
+                return await asyncio.to_thread(self.factory)
+            except BaseException:
+                self._created -= 1
+                raise
+
+        if self.overflow:
+            return await asyncio.to_thread(self.factory)
+
+        return await self._idle.get()
+
+    def has_idle_handle(self) -> bool:
+        """True when a lease would not have to wait for (or overflow past) a busy handle."""
+        return not self._idle.empty() or self._created < self.size
+
+    def _put(self, handle):
+        try:
+            self._idle.put_nowait(handle)
+        except asyncio.QueueFull:
+            # Overflow handle: let it go, its owner frees the native object
+            pass
+
+    def _release(self, handle):
+        running = self._running.pop(id(handle), None)
+        if running is None or running.done():
+            self._put(handle)
+            return
+
+        def put_when_done(future: asyncio.Future):
+            if not future.cancelled():
+                # Retrieve the exception so the abandoned call does not log as unhandled
+                future.exception()
+            self._put(handle)
+
+        running.add_done_callback(put_when_done)
+
+    async def run(self, handle, func: Callable, *args):
+        """Call `func(*args)` in a worker thread on behalf of the leased `handle`.
+
+        A thread cannot be interrupted, so when the caller is cancelled the call keeps
+        running and the handle stays out of the pool until it returns.
+        """
+        future = asyncio.ensure_future(asyncio.to_thread(func, *args))
+        self._running[id(handle)] = future
+        result = await asyncio.shield(future)
+        self._running.pop(id(handle), None)
+        return result
+
+    @asynccontextmanager
+    async def acquire(self):
+        handle = await self._get()
+        try:
+            yield handle
+        finally:
+            self._release(handle)
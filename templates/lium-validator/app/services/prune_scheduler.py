@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import shlex
+import time
+
+import asyncssh
+from datura.requests.miner_requests import ExecutorSSHInfo
+
+from core.utils import _m, get_extra_info
+from services.const import (
+    PRUNE_DELAY_SECONDS,
+    PRUNE_IMAGE_UNUSED_SECONDS,
+    PRUNE_MIN_FREE_DISK_KB,
+    PRUNE_PROTECTED_IMAGE_PREFIXES,
+    PRUNE_VOLUME_PROTECTION_SECONDS,
+    PRUNE_WINDOW_SECONDS,
+)
+from services.redis_service import RedisService
+
+logger = logging.getLogger(__name__)
+
+
+def executor_key(executor_info: ExecutorSSHInfo) -> tuple[str, int]:
+    return (executor_info.address, executor_info.ssh_port)
+
+
+class PruneScheduler:
+    """Per-executor, coalesced docker image/volume pruning.
+
+    Each kind of prune runs at most once per `PRUNE_WINDOW_SECONDS` per executor, and only
+    once the executor's last scraped `hard_disk.free` is known to be below
+    `PRUNE_MIN_FREE_DISK_KB`. Image prunes remove dangling images plus tagged images that no
+    rental has used for `PRUNE_IMAGE_UNUSED_SECONDS`; last-use times are kept in Redis so a
+    validator restart doesn't make every image look unused. Volume prunes skip volumes that
+    a container creation has reserved but not mounted yet.
+    """
+
+    def __init__(self):
+        self._last_pruned: dict[tuple[tuple[str, int], str], float] = {}
+        self._disk_free: dict[tuple[str, int], int] = {}
+        self._protected_volumes: dict[tuple[str, int], dict[str, float]] = {}
+        self._locks: dict[tuple[str, int], asyncio.Lock] = {}
+        self._pending: dict[tuple[str, int], asyncio.Task] = {}
+
+    def record_disk_free(self, key: tuple[str, int], free_kb: int):
+        self._disk_free[key] = free_kb
+
+    async def touch_images(self, redis_service: RedisService, key: tuple[str, int], images: list[str]):
+        """Record that `images` are in use on the executor now."""
+        # Match `docker images` output, which always shows a tag
+        images = [
+            image if ":" in image.rsplit("/", 1)[-1] else f"{image}:latest"
+            for image in images
+        ]
+        try:
+            await redis_service.touch_executor_images(key, images, time.time())
+        except Exception as e:
+            logger.warning(f"Failed to record image use on {key[0]}: {e}")
+
+    def protect_volume(self, key: tuple[str, int], volume: str):
+        self._protected_volumes.setdefault(key, {})[volume] = time.monotonic() + PRUNE_VOLUME_PROTECTION_SECONDS
+
+    def release_volume(self, key: tuple[str, int], volume: str):
+        self._protected_volumes.get(key, {}).pop(volume, None)
+
+    def _is_protected_volume(self, key: tuple[str, int], volume: str) -> bool:
+        expires_at = self._protected_volumes.get(key, {}).get(volume)
+        return expires_at is not None and expires_at > time.monotonic()
+
+    def under_disk_pressure(self, key: tuple[str, int]) -> bool:
+        free_kb = self._disk_free.get(key)
+        return free_kb is not None and free_kb < PRUNE_MIN_FREE_DISK_KB
+
+    def _due(self, key: tuple[str, int], kind: str) -> bool:
+        last_pruned = self._last_pruned.get((key, kind))
+        if last_pruned is not None and time.monotonic() - last_pruned < PRUNE_WINDOW_SECONDS:
+            return False
+        return self.under_disk_pressure(key)
+
+    def _lock(self, key: tuple[str, int]) -> asyncio.Lock:
+        if key not in self._locks:
+            self._locks[key] = asyncio.Lock()
+        return self._locks[key]
+
+    async def prune_volumes(self, ssh_client: asyncssh.SSHClientConnection, key: tuple[str, int], extra: dict = {}):
+        """Remove dangling volumes if due; replaces `docker volume prune -af`."""
+        lock = self._lock(key)
+        if lock.locked() or not self._due(key, "volumes"):
+            return
+
+        async with lock:
+            self._last_pruned[(key, "volumes")] = time.monotonic()
+            result = await ssh_client.run("/usr/bin/docker volume ls -q --filter dangling=true")
+            volumes = [
+                volume for volume in result.stdout.split()
+                if not self._is_protected_volume(key, volume)
+            ]
+            if volumes:
+                await ssh_client.run(f"/usr/bin/docker volume rm {' '.join(shlex.quote(v) for v in volumes)}")
+
+            logger.info(_m(f"PRUNE: removed {len(volumes)} dangling volumes", extra=get_extra_info(extra)))
+
+    async def prune_images(
+        self,
+        ssh_client: asyncssh.SSHClientConnection,
+        redis_service: RedisService,
+        key: tuple[str, int],
+        extra: dict = {},
+    ):
+        """Remove dangling images and tagged images unused for PRUNE_IMAGE_UNUSED_SECONDS if due."""
+        lock = self._lock(key)
+        if lock.locked() or not self._due(key, "images"):
+            return
+
+        async with lock:
+            self._last_pruned[(key, "images")] = time.monotonic()
+            await ssh_client.run("/usr/bin/docker image prune -f")
+
+            result = await ssh_client.run(
+                "/usr/bin/docker images --filter dangling=false --format '{{.Repository}}:{{.Tag}}'"
+            )
+            present_images = set(result.stdout.split())
+
+            now = time.time()
+            try:
+                # Images without a recorded use start their unused period now instead of
+                # being evicted on sight
+                await redis_service.touch_executor_images(key, list(present_images), now, only_new=True)
+                last_used = await redis_service.get_executor_images_last_used(key)
+                await redis_service.remove_executor_images(
+                    key, [image for image in last_used if image not in present_images]
+                )
+            except Exception as e:
+                logger.warning(
+                    _m(f"PRUNE: skipped unused image eviction, image use unavailable: {e}", extra=get_extra_info(extra))
+                )
+                return
+
+            images = [
+                image for image in present_images
+                if now - last_used.get(image, now) > PRUNE_IMAGE_UNUSED_SECONDS
+                and not image.startswith(PRUNE_PROTECTED_IMAGE_PREFIXES)
+            ]
+            if images:
+                # Without -f, images still used by a container are left in place
+                await ssh_client.run(f"/usr/bin/docker rmi {' '.join(shlex.quote(image) for image in images)}")
+
+            logger.info(_m(f"PRUNE: pruned images, evicted up to {len(images)} unused images", extra=get_extra_info(extra)))
+
+    def schedule_image_prune(
+        self,
+        executor_info: ExecutorSSHInfo,
+        pkey: asyncssh.SSHKey,
+        redis_service: RedisService,
+    ):
+        """Prune images on the executor in the background after PRUNE_DELAY_SECONDS.
+
+        Requests that land while one is pending are folded into it, and no SSH connection is
+        opened unless the prune is due.
+        """
+        key = executor_key(executor_info)
+        if key in self._pending:
+            return
+
+        async def prune():
+            try:
+                await asyncio.sleep(PRUNE_DELAY_SECONDS)
+                if not self._due(key, "images"):
+                    return
+                async with asyncssh.connect(
+                    host=executor_info.address,
+                    port=executor_info.ssh_port,
+                    username=executor_info.ssh_username,
+                    client_keys=[pkey],
+                    known_hosts=None,
+                ) as ssh_client:
+                    await self.prune_images(
+                        ssh_client, redis_service, key, {"executor_ip_address": executor_info.address}
+                    )
+            except Exception as e:
+                logger.warning(f"Failed to prune images on {executor_info.address}: {e}")
+            finally:
+                self._pending.pop(key, None)
+
+        self._pending[key] = asyncio.create_task(prune())
+
+
+prune_scheduler = PruneScheduler()
@@ -24,6 +24,9 @@ NORMALIZED_SCORE_CHANNEL = "normalized_score_channel"
 REVENUE_PER_GPU_TYPE_SET = "revenue_per_gpu_type"
 BANNED_GUIDS = "banned_guids"
 PORTION_PER_GPU_TYPE_SET = "portion_per_gpu_type"
+IMAGE_POPULARITY_SET = "image_popularity"
+IMAGE_CACHE_STATS_KEY = "image_cache_stats"
+EXECUTOR_IMAGES_PREFIX = "executor_images"
 
 logger = logging.getLogger(__name__)
 
@@ -123,6 +126,35 @@ class RedisService:
         async with self.lock:
             await self.redis.hdel(key, *fields)
 
+    async def hincrby(self, key: str, field: str, amount: int = 1) -> int:
+        async with self.lock:
+            return await self.redis.hincrby(key, field, amount)
+
+    async def zincrby(self, key: str, member: str, amount: float = 1) -> float:
+        """Increment the score of a member in a sorted set in Redis."""
+        async with self.lock:
+            return await self.redis.zincrby(key, amount, member)
+
+    async def zrevrange(self, key: str, start: int, end: int) -> list[bytes]:
+        """Get members of a sorted set in Redis, highest score first."""
+        async with self.lock:
+            return await self.redis.zrevrange(key, start, end)
+
+    async def zadd(self, key: str, mapping: dict[str, float], nx: bool = False):
+        """Set the scores of sorted set members in Redis; with `nx` only new members are added."""
+        async with self.lock:
+            await self.redis.zadd(key, mapping, nx=nx)
+
+    async def zrange_withscores(self, key: str) -> list[tuple[bytes, float]]:
+        """Get all members of a sorted set in Redis with their scores, lowest first."""
+        async with self.lock:
+            return await self.redis.zrange(key, 0, -1, withscores=True)
+
+    async def zrem(self, key: str, *members: str):
+        """Remove members from a sorted set in Redis."""
+        async with self.lock:
+            await self.redis.zrem(key, *members)
+
     async def clear_by_pattern(self, pattern: str):
         async with self.lock:
             async for key in self.redis.scan_iter(match=pattern):
@@ -262,3 +294,35 @@ class RedisService:
         if not data:
             return []
         return json.loads(data)
+
+    async def increment_image_popularity(self, docker_image: str):
+        await self.zincrby(IMAGE_POPULARITY_SET, docker_image)
+
+    async def get_popular_images(self, count: int) -> list[str]:
+        images = await self.zrevrange(IMAGE_POPULARITY_SET, 0, count - 1)
+        return [image.decode() for image in images]
+
+    async def record_image_cache_result(self, hit: bool):
+        await self.hincrby(IMAGE_CACHE_STATS_KEY, "hits" if hit else "misses")
+
+    async def get_image_cache_stats(self) -> dict[str, int]:
+        data = await self.hgetall(IMAGE_CACHE_STATS_KEY)
+        return {key.decode(): int(value) for key, value in data.items()}
+
+    async def touch_executor_images(
+        self, executor_key: tuple[str, int], images: list[str], timestamp: float, only_new: bool = False
+    ):
+        if images:
+            await self.zadd(
+                f"{EXECUTOR_IMAGES_PREFIX}:{executor_key[0]}:{executor_key[1]}",
+                {image: timestamp for image in images},
+                nx=only_new,
+            )
+
+    async def get_executor_images_last_used(self, executor_key: tuple[str, int]) -> dict[str, float]:
+        data = await self.zrange_withscores(f"{EXECUTOR_IMAGES_PREFIX}:{executor_key[0]}:{executor_key[1]}")
+        return {image.decode(): timestamp for image, timestamp in data}
+
+    async def remove_executor_images(self, executor_key: tuple[str, int], images: list[str]):
+        if images:
+            await self.zrem(f"{EXECUTOR_IMAGES_PREFIX}:{executor_key[0]}:{executor_key[1]}", *images)
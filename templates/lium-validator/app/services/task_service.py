@@ -1,4 +1,3 @@
-import json
 import logging
 import random
 import uuid
@@ -35,8 +34,10 @@ from services.ssh_service import SSHService
 from services.interactive_shell_service import InteractiveShellService
 from services.matrix_validation_service import ValidationService
 from services.verifyx_validation_service import VerifyXValidationService
-from services.collateral_contract_service import CollateralContractService
+from services.collateral_contract_service import CollateralContractService, MinerCollateralPrefetch
 from services.file_encrypt_service import ORIGINAL_KEYS
+from services.machine_spec import MachineSpec
+from services.prune_scheduler import executor_key, prune_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -390,6 +391,7 @@ class TaskService:
         private_key: str,
         public_key: str,
         encrypted_files: MinerJobEnryptedFiles,
+        collateral_prefetch: MinerCollateralPrefetch | None = None,
     ):
         default_extra = {
             "job_batch_id": miner_info.job_batch_id,
@@ -461,48 +463,38 @@ class TaskService:
                 if not machine_specs:
                     raise Exception("No machine specs found")
 
-                machine_spec = json.loads(
+                # parse and de-obfuscate machine_spec
+                spec = MachineSpec.parse(
                     self.ssh_service.decrypt_payload(
                         encrypted_files.encrypt_key, machine_specs[0].strip()
-                    )
+                    ),
+                    encrypted_files.all_keys,
+                    ORIGINAL_KEYS,
                 )
+                machine_spec = spec.data
 
-                # de-obfuscate machine_spec
-                all_keys = encrypted_files.all_keys
-                reverse_all_keys = {v: k for k, v in all_keys.items()}
-
-                updated_machine_spec = self.update_keys(machine_spec, reverse_all_keys)
-                updated_machine_spec = self.update_keys(updated_machine_spec, ORIGINAL_KEYS)
-
-                machine_spec = {**updated_machine_spec}
-
-                gpu_model = None
-                if machine_spec.get("gpu", {}).get("count", 0) > 0:
-                    details = machine_spec["gpu"].get("details", [])
-                    if len(details) > 0:
-                        gpu_model = details[0].get("name", None)
-
-                gpu_count = machine_spec.get("gpu", {}).get("count", 0)
-                gpu_details = machine_spec.get("gpu", {}).get("details", [])
-                gpu_model_count = f'{gpu_model}:{gpu_count}'
+                gpu_model = spec.gpu_model
+                gpu_count = spec.gpu_count
+                gpu_details = spec.gpu_details
+                gpu_model_count = spec.gpu_model_count
 
-                nvidia_driver = machine_spec.get("gpu", {}).get("driver", "")
-                libnvidia_ml = machine_spec.get("md5_checksums", {}).get("libnvidia_ml", "")
+                nvidia_driver = spec.nvidia_driver
+                libnvidia_ml = spec.libnvidia_ml
 
-                docker_version = machine_spec.get("docker", {}).get("version", "")
-                docker_digest = machine_spec.get("md5_checksums", {}).get("docker", "")
+                docker_version = spec.docker_version
+                docker_digest = spec.docker_digest
 
-                ram = machine_spec.get("ram", {}).get("total", 0)
-                storage = machine_spec.get("hard_disk", {}).get("free", 0)
+                ram = spec.ram
+                storage = spec.storage
+                if storage:
+                    prune_scheduler.record_disk_free(executor_key(executor_info), storage)
 
-                gpu_processes = machine_spec.get("gpu_processes", [])
+                gpu_processes = spec.gpu_processes
 
-                sysbox_runtime = machine_spec.get("sysbox_runtime", False)
-                vram = 0
-                for detail in gpu_details:
-                    vram += detail.get("capacity", 0) * 1024
+                sysbox_runtime = spec.sysbox_runtime
+                vram = spec.vram
 
-                gpu_uuids = ','.join([detail.get('uuid', '') for detail in gpu_details])
+                gpu_uuids = spec.gpu_uuids
 
                 logger.info(
                     _m(
@@ -524,13 +516,13 @@ class TaskService:
                     miner_hotkey=miner_info.miner_hotkey,
                     executor_uuid=executor_info.uuid,
                     gpu_model=gpu_model,
-                    gpu_count=gpu_count
+                    gpu_count=gpu_count,
+                    collateral_prefetch=collateral_prefetch,
                 )
-                default_extra = {
-                    **default_extra,
+                default_extra.update({
                     "collateral_deposited": collateral_deposited,
                     "collateral_contract_error_message": collateral_contract_error_message,
-                }
+                })
 
                 if gpu_count > MAX_GPU_COUNT:
                     log_text = _m(
@@ -732,10 +724,7 @@ class TaskService:
                 # check rented status
                 rented_machine = await self.redis_service.get_rented_machine(executor_info)
                 if rented_machine and rented_machine.get("container_name", ""):
-                    default_extra = {
-                        **default_extra,
-                        "rented": True,
-                    }
+                    default_extra["rented"] = True
                     container_name = rented_machine.get("container_name", "")
                     is_pod_running, ssh_pub_keys = await self.check_pod_running(
                         ssh_client=shell.ssh_client,
@@ -804,10 +793,7 @@ class TaskService:
                     port_count = await self.get_available_port_count(
                         miner_info.miner_hotkey, executor_info.uuid
                     )
-                    machine_spec = {
-                        **machine_spec,
-                        "available_port_count": port_count,
-                    }
+                    machine_spec["available_port_count"] = port_count
 
                     log_msg = "Executor is already rented."
                     actual_score, job_score, warning_message = self.calc_scores(
@@ -871,10 +857,7 @@ class TaskService:
 
                 renting_in_progress = await self.redis_service.renting_in_progress(miner_info.miner_hotkey, executor_info.uuid)
                 if not renting_in_progress and not rented_machine:
-                    default_extra = {
-                        **default_extra,
-                        "renting_in_progress": True,
-                    }
+                    default_extra["renting_in_progress"] = True
                     docker_connection_check_result = await self.executor_connectivity_service.batch_verify_ports(
                         ssh_client=shell.ssh_client,
                         job_batch_id=miner_info.job_batch_id,
@@ -886,10 +869,7 @@ class TaskService:
                     )
 
                     sysbox_runtime = docker_connection_check_result.sysbox_runtime
-                    machine_spec = {
-                        **machine_spec,
-                        "sysbox_runtime": sysbox_runtime,
-                    }
+                    machine_spec["sysbox_runtime"] = sysbox_runtime
                     if not docker_connection_check_result.success:
                         return await self._handle_task_result(
                             miner_info=miner_info,
@@ -986,10 +966,7 @@ class TaskService:
                 port_count = await self.get_available_port_count(
                     miner_info.miner_hotkey, executor_info.uuid
                 )
-                machine_spec = {
-                    **machine_spec,
-                    "available_port_count": port_count,
-                }
+                machine_spec["available_port_count"] = port_count
 
                 log_msg = "Train task is finished."
                 actual_score, job_score, warning_message = self.calc_scores(
@@ -1021,6 +998,14 @@ class TaskService:
                     ),
                 )
 
+                if success and not renting_in_progress:
+                    await self.executor_connectivity_service.warm_image_cache(
+                        ssh_client=shell.ssh_client,
+                        executor_info=executor_info,
+                        free_disk_kb=machine_spec.get("hard_disk", {}).get("free", 0),
+                        extra=default_extra,
+                    )
+
                 logger.debug(
                     _m(
                         "SSH connection closed for executor",
@@ -1126,25 +1111,5 @@ class TaskService:
 
             return None, str(e)
 
-    def update_keys(self, d, key_mapping):
-        updated_dict = {}
-        for key, value in d.items():
-            # Get the original key using the reverse mapping
-            original_key = key_mapping.get(key)  # Default to the same key if not found
-            # Recursively update keys if the value is a dictionary
-            if isinstance(value, dict):
-                updated_dict[original_key] = self.update_keys(value, key_mapping)
-            elif isinstance(value, list):
-                updated_list = []
-                for item in value:
-                    if isinstance(item, dict):
-                        updated_list.append(self.update_keys(item, key_mapping))
-                    else:
-                        updated_list.append(item)
-                updated_dict[original_key] = updated_list
-            else:
-                updated_dict[original_key] = value
-        return updated_dict
-
 
 TaskServiceDep = Annotated[TaskService, Depends(TaskService)]
@@ -1,8 +1,11 @@
+import asyncio
 import ctypes
+import functools
 import hashlib
 import json
 import random
 import os
+import secrets
 import logging
 from typing import Dict, Any, Optional, Tuple, List
 from core.utils import _m, get_extra_info
@@ -15,7 +18,10 @@ from services.const import (
     STORAGE_THROUGHPUT_TEST_GB,
     NETWORK_TIMEOUT_SECONDS,
     NETWORK_MIN_DOWNLOAD_SPEED_MBPS,
+    VERIFYX_REMOTE_CHECKSUM,
+    NATIVE_HANDLE_POOL_SIZE,
 )
+from services.native_handle_pool import NativeHandlePool
 
 
 logger = logging.getLogger(__name__)
@@ -23,29 +29,33 @@ logger = logging.getLogger(__name__)
 GB_TO_BYTES = 1024 * 1024 * 1024
 
 
+@functools.lru_cache(maxsize=None)
+def _load_verifyx_lib(lib_path: str) -> ctypes.CDLL:
+    """Load the VerifyX library and declare its signatures once per process."""
+    lib = ctypes.CDLL(lib_path)
+    lib.service_new.restype = ctypes.POINTER(ctypes.c_void_p)
+    lib.generate.argtypes = [ctypes.POINTER(ctypes.c_void_p), ctypes.c_char_p]
+    lib.generate.restype = ctypes.c_int
+    lib.get_cipher_text.argtypes = [ctypes.POINTER(ctypes.c_void_p)]
+    lib.get_cipher_text.restype = ctypes.POINTER(ctypes.c_char)
+    lib.verify.argtypes = [
+        ctypes.POINTER(ctypes.c_void_p),
+        ctypes.c_char_p,
+        ctypes.c_uint64,
+    ]
+    lib.verify.restype = ctypes.POINTER(ctypes.c_char)
+    lib.service_del.argtypes = [ctypes.POINTER(ctypes.c_void_p)]
+    lib.str_del.argtypes = [ctypes.POINTER(ctypes.c_char)]
+    return lib
+
+
 class VerifyXValidator:
     def __init__(self, lib_name: str, seed: int):
         lib_path = os.path.join(os.path.dirname(__file__), lib_name)
-        self.lib = ctypes.CDLL(lib_path)
-        self._setup_signatures()
+        self.lib = _load_verifyx_lib(lib_path)
         self.service = self._create_service()
         self.seed = seed
 
-    def _setup_signatures(self):
-        self.lib.service_new.restype = ctypes.POINTER(ctypes.c_void_p)
-        self.lib.generate.argtypes = [ctypes.POINTER(ctypes.c_void_p), ctypes.c_char_p]
-        self.lib.generate.restype = ctypes.c_int
-        self.lib.get_cipher_text.argtypes = [ctypes.POINTER(ctypes.c_void_p)]
-        self.lib.get_cipher_text.restype = ctypes.POINTER(ctypes.c_char)
-        self.lib.verify.argtypes = [
-            ctypes.POINTER(ctypes.c_void_p),
-            ctypes.c_char_p,
-            ctypes.c_uint64,
-        ]
-        self.lib.verify.restype = ctypes.POINTER(ctypes.c_char)
-        self.lib.service_del.argtypes = [ctypes.POINTER(ctypes.c_void_p)]
-        self.lib.str_del.argtypes = [ctypes.POINTER(ctypes.c_char)]
-
     def _create_service(self):
         return self.lib.service_new()
 
@@ -87,11 +97,44 @@ class VerifyXResponse:
 class VerifyXValidationService:
     def __init__(self):
         self.lib_name = "/usr/lib/libverifyx.so"
+        # (st_ino, st_size, st_mtime_ns) -> (library content, its sha256 hex digest).
+        # Re-reading and hashing the ~3 MB library cost ~4 ms of event-loop time per
+        # executor; a stat() is a few microseconds, and the library only changes on deploy.
+        self._lib_cache: tuple[tuple[int, int, int], bytes, str] | None = None
+        # VerifyX services keep challenge state between generate and verify, so a validator
+        # is leased for the whole challenge; when all are busy a temporary one is used.
+        self.validator_pool = NativeHandlePool(
+            lambda: VerifyXValidator(self.lib_name, 0),
+            size=NATIVE_HANDLE_POOL_SIZE,
+            overflow=True,
+        )
+
+    def _lib_content(self, lib_path: str) -> tuple[bytes, str]:
+        """Return the library content and its sha256, re-reading only when the file changed."""
+        stat = os.stat(lib_path)
+        key = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+        if self._lib_cache is None or self._lib_cache[0] != key:
+            with open(lib_path, "rb") as f:
+                content = f.read()
+            self._lib_cache = (key, content, hashlib.sha256(content).hexdigest())
+
+        return self._lib_cache[1], self._lib_cache[2]
 
     def _calculate_lib_checksum(self, lib_path: str) -> str:
         """Calculate SHA256 checksum of the VerifyX shared library."""
-        with open(lib_path, "rb") as f:
-            return hashlib.sha256(f.read()).hexdigest()
+        return self._lib_content(lib_path)[1]
+
+    def _calculate_salted_lib_checksum(self, lib_path: str, salt: str) -> str:
+        """Calculate SHA256 checksum of `salt` followed by the VerifyX shared library.
+
+        The salt goes first so the digest cannot be extended from a stored midstate of the
+        library; the whole file is hashed again for every salt.
+        """
+        content, _ = self._lib_content(lib_path)
+        lib_hash = hashlib.sha256(salt.encode("utf-8"))
+        lib_hash.update(content)
+        return lib_hash.hexdigest()
 
     async def _get_executor_checksum(self, shell) -> str:
         """Get the VerifyX library checksum from executor using SCP."""
@@ -103,6 +146,26 @@ class VerifyXValidationService:
         except Exception:
             return ""
 
+    async def _get_executor_salted_checksum(self, shell, salt: str) -> str:
+        """Get the salted VerifyX library checksum computed by sha256sum on the executor."""
+        try:
+            return await shell.get_salted_sha256_checksum(self.lib_name, salt)
+        except Exception:
+            return ""
+
+    async def _verify_lib_checksum(self, shell) -> bool:
+        if VERIFYX_REMOTE_CHECKSUM:
+            salt = secrets.token_hex(16)
+            local_checksum = await asyncio.to_thread(
+                self._calculate_salted_lib_checksum, self.lib_name, salt
+            )
+            executor_checksum = await self._get_executor_salted_checksum(shell, salt)
+        else:
+            local_checksum = self._calculate_lib_checksum(self.lib_name)
+            executor_checksum = await self._get_executor_checksum(shell)
+
+        return local_checksum == executor_checksum
+
     async def validate_verifyx_and_process_job(
         self,
         shell,
@@ -112,10 +175,7 @@ class VerifyXValidationService:
     ):
         try:
             # Verify checksum before proceeding with validation
-            local_checksum = self._calculate_lib_checksum(self.lib_name)
-            executor_checksum = await self._get_executor_checksum(shell)
-
-            if local_checksum != executor_checksum:
+            if not await self._verify_lib_checksum(shell):
                 return VerifyXResponse(error="executor not using latest VerifyX library (checksum verification failed)")
 
             gpu_details = machine_spec.get("gpu", {}).get("details", [])
@@ -126,55 +186,60 @@ class VerifyXValidationService:
             gpu_info = {"uuids": gpu_uuids, "gpu_count": gpu_count, "gpu_model": gpu_model}
 
             seed = random.getrandbits(64)
-            verifyx_validator = VerifyXValidator(self.lib_name, seed)
-
-            challenge_input = {
-                "seed": seed,
-                "machine_info": gpu_info,
-                "config": {
-                    "memory_allocation_percentage": MEMORY_ALLOCATION_PERCENTAGE,
-                    "memory_min_test_gb": MEMORY_MIN_TEST_GB,
-                    "memory_max_test_gb": MEMORY_MAX_TEST_GB,
-                    "storage_min_available_gb": STORAGE_MIN_AVAILABLE_GB,
-                    "storage_throughput_test_gb": STORAGE_THROUGHPUT_TEST_GB,
-                    "network_timeout_seconds": NETWORK_TIMEOUT_SECONDS,
-                },
-            }
-
-            cipher_text = verifyx_validator.generate_challenge(challenge_input)
-
-            command = f"{executor_info.python_path} {executor_info.root_dir}/src/verifyx_executor.py --seed {seed} --cipher_text {cipher_text}"
-
-            log_extra = {
-                **default_extra,
-                "seed": seed,
-                "cipher_text": cipher_text,
-                "challenge_input": challenge_input,
-            }
-
-            logger.info(_m("VerifyX Python Script Command", extra=get_extra_info(log_extra)))
-
-            try:
-                result = await shell.ssh_client.run(command)
-            except Exception:
-                return VerifyXResponse(error="SSH command execution failed")
-
-            if result is None:
-                return VerifyXResponse(error="SSH command returned no result")
-
-            try:
-                stdout = result.stdout.strip()
-            except AttributeError:
-                return VerifyXResponse(error="SSH result missing stdout")
-
-            logger.info(_m("Challenge response received", extra=get_extra_info(log_extra)))
-
-            try:
-                payload = verifyx_validator.verify_response(stdout)
-                verification_result = _perform_verification_checks(payload)
-                return VerifyXResponse(data=verification_result)
-            except Exception as e:
-                return VerifyXResponse(error=f"challenge verification failed ({str(e)})")
+            async with self.validator_pool.acquire() as verifyx_validator:
+                verifyx_validator.seed = seed
+
+                challenge_input = {
+                    "seed": seed,
+                    "machine_info": gpu_info,
+                    "config": {
+                        "memory_allocation_percentage": MEMORY_ALLOCATION_PERCENTAGE,
+                        "memory_min_test_gb": MEMORY_MIN_TEST_GB,
+                        "memory_max_test_gb": MEMORY_MAX_TEST_GB,
+                        "storage_min_available_gb": STORAGE_MIN_AVAILABLE_GB,
+                        "storage_throughput_test_gb": STORAGE_THROUGHPUT_TEST_GB,
+                        "network_timeout_seconds": NETWORK_TIMEOUT_SECONDS,
+                    },
+                }
+
+                cipher_text = await self.validator_pool.run(
+                    verifyx_validator, verifyx_validator.generate_challenge, challenge_input
+                )
+
+                command = f"{executor_info.python_path} {executor_info.root_dir}/src/verifyx_executor.py --seed {seed} --cipher_text {cipher_text}"
+
+                log_extra = {
+                    **default_extra,
+                    "seed": seed,
+                    "cipher_text": cipher_text,
+                    "challenge_input": challenge_input,
+                }
+
+                logger.info(_m("VerifyX Python Script Command", extra=get_extra_info(log_extra)))
+
+                try:
+                    result = await shell.ssh_client.run(command)
+                except Exception:
+                    return VerifyXResponse(error="SSH command execution failed")
+
+                if result is None:
+                    return VerifyXResponse(error="SSH command returned no result")
+
+                try:
+                    stdout = result.stdout.strip()
+                except AttributeError:
+                    return VerifyXResponse(error="SSH result missing stdout")
+
+                logger.info(_m("Challenge response received", extra=get_extra_info(log_extra)))
+
+                try:
+                    payload = await self.validator_pool.run(
+                        verifyx_validator, verifyx_validator.verify_response, stdout
+                    )
+                    verification_result = _perform_verification_checks(payload)
+                    return VerifyXResponse(data=verification_result)
+                except Exception as e:
+                    return VerifyXResponse(error=f"challenge verification failed ({str(e)})")
 
         except Exception as e:
             return VerifyXResponse(error=f"unexpected error ({str(e)})")